@@ -4,18 +4,19 @@ Bot Handlers for Whitelist Management
 
 This module contains all admin command handlers for managing the whitelist system.
 """
+import asyncio
 from telegram import Update
 from telegram.ext import ContextTypes
 from app.whitelist import (
     check_user_access,
     check_username_access,
     is_admin,
-    add_user_to_permanent_whitelist,
-    remove_user_from_permanent_whitelist,
-    add_username_to_permanent_whitelist,
-    remove_username_from_permanent_whitelist,
-    add_admin_to_permanent_config,
-    remove_admin_from_permanent_config,
+    add_user_to_permanent_whitelist_async,
+    remove_user_from_permanent_whitelist_async,
+    add_username_to_permanent_whitelist_async,
+    remove_username_from_permanent_whitelist_async,
+    add_admin_to_permanent_config_async,
+    remove_admin_from_permanent_config_async,
 )
 from app.db import db
 from app.utils.logger import get_logger
@@ -35,7 +36,7 @@ def require_admin(func):
             await update.message.reply_text(
                 "❌ У вас нет прав администратора для выполнения этой команды."
             )
-            logger.warning(f"Non-admin user {user_id} attempted to use admin command")
+            logger.warning("Non-admin user %s attempted to use admin command", user_id)
             return
         
         return await func(update, context)
@@ -79,7 +80,7 @@ async def admin_add_user_command(update: Update, context: ContextTypes.DEFAULT_T
                 return
         
         # Add user to permanent whitelist
-        success = add_user_to_permanent_whitelist(target_user_id)
+        success = await add_user_to_permanent_whitelist_async(target_user_id)
         
         if success:
             # Also add to database (for tracking)
@@ -90,15 +91,15 @@ async def admin_add_user_command(update: Update, context: ContextTypes.DEFAULT_T
                 f"🔄 Пользователь теперь имеет постоянный доступ к боту.\n"
                 f"📝 ID пользователя добавлен в whitelist_config.py и сохранится после перезапуска бота."
             )
-            logger.info(f"Admin {user_id} added user {target_user_id} to permanent whitelist")
+            logger.info("Admin %s added user %s to permanent whitelist", user_id, target_user_id)
         else:
             await update.message.reply_text(
                 f"❌ Ошибка при добавлении пользователя {target_user_id} в whitelist."
             )
-            logger.error(f"Failed to add user {target_user_id} to whitelist")
+            logger.error("Failed to add user %s to whitelist", target_user_id)
             
     except Exception as e:
-        logger.error(f"Error in admin_add_user_command: {e}", exc_info=True)
+        logger.error("Error in admin_add_user_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при выполнении команды.")
 
 
@@ -145,22 +146,22 @@ async def admin_remove_user_command(update: Update, context: ContextTypes.DEFAUL
                 return
         
         # Remove user from permanent whitelist
-        success = remove_user_from_permanent_whitelist(target_user_id)
+        success = await remove_user_from_permanent_whitelist_async(target_user_id)
         
         if success:
             await update.message.reply_text(
                 f"✅ Пользователь {target_user_id} удален из постоянного whitelist.\n\n"
                 f"🔄 Изменения сохранены в whitelist_config.py."
             )
-            logger.info(f"Admin {user_id} removed user {target_user_id} from permanent whitelist")
+            logger.info("Admin %s removed user %s from permanent whitelist", user_id, target_user_id)
         else:
             await update.message.reply_text(
                 f"❌ Ошибка при удалении пользователя {target_user_id} из whitelist."
             )
-            logger.error(f"Failed to remove user {target_user_id} from whitelist")
+            logger.error("Failed to remove user %s from whitelist", target_user_id)
             
     except Exception as e:
-        logger.error(f"Error in admin_remove_user_command: {e}", exc_info=True)
+        logger.error("Error in admin_remove_user_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при выполнении команды.")
 
 
@@ -204,22 +205,22 @@ async def admin_add_username_command(update: Update, context: ContextTypes.DEFAU
                 return
         
         # Add username to permanent whitelist
-        success = add_username_to_permanent_whitelist(username)
+        success = await add_username_to_permanent_whitelist_async(username)
         
         if success:
             await update.message.reply_text(
                 f"✅ Username @{username} добавлен в постоянный whitelist!\n\n"
                 f"🔄 Username добавлен в whitelist_config.py и сохранится после перезапуска бота."
             )
-            logger.info(f"Admin {user_id} added username {username} to permanent whitelist")
+            logger.info("Admin %s added username %s to permanent whitelist", user_id, username)
         else:
             await update.message.reply_text(
                 f"❌ Ошибка при добавлении username @{username} в whitelist."
             )
-            logger.error(f"Failed to add username {username} to whitelist")
+            logger.error("Failed to add username %s to whitelist", username)
             
     except Exception as e:
-        logger.error(f"Error in admin_add_username_command: {e}", exc_info=True)
+        logger.error("Error in admin_add_username_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при выполнении команды.")
 
 
@@ -263,22 +264,22 @@ async def admin_remove_username_command(update: Update, context: ContextTypes.DE
                 return
         
         # Remove username from permanent whitelist
-        success = remove_username_from_permanent_whitelist(username)
+        success = await remove_username_from_permanent_whitelist_async(username)
         
         if success:
             await update.message.reply_text(
                 f"✅ Username @{username} удален из постоянного whitelist.\n\n"
                 f"🔄 Изменения сохранены в whitelist_config.py."
             )
-            logger.info(f"Admin {user_id} removed username {username} from permanent whitelist")
+            logger.info("Admin %s removed username %s from permanent whitelist", user_id, username)
         else:
             await update.message.reply_text(
                 f"❌ Ошибка при удалении username @{username} из whitelist."
             )
-            logger.error(f"Failed to remove username {username} from whitelist")
+            logger.error("Failed to remove username %s from whitelist", username)
             
     except Exception as e:
-        logger.error(f"Error in admin_remove_username_command: {e}", exc_info=True)
+        logger.error("Error in admin_remove_username_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при выполнении команды.")
 
 
@@ -289,9 +290,9 @@ async def admin_whitelist_status_command(update: Update, context: ContextTypes.D
     Command: /whitelist
     """
     try:
-        # Force reload config to get latest data
+        # Force reload config to get latest data, off the event loop
         from app.whitelist import _reload_config
-        _reload_config()
+        await asyncio.to_thread(_reload_config)
         
         # Get fresh config reference after reload
         from app import whitelist
@@ -321,7 +322,7 @@ async def admin_whitelist_status_command(update: Update, context: ContextTypes.D
         admin_user_ids = getattr(current_config, 'ADMIN_USER_IDS', [])
         
         # Log what we're reading for debugging
-        logger.info(f"Whitelist status - User IDs: {authorized_user_ids}, Usernames: {authorized_usernames}")
+        logger.info("Whitelist status - User IDs: %s, Usernames: %s", authorized_user_ids, authorized_usernames)
         
         # Build status message
         message = f"🔐 **Статус Whitelist**\n\n"
@@ -366,10 +367,10 @@ async def admin_whitelist_status_command(update: Update, context: ContextTypes.D
         message += "• `/removeadmin_123456` - Удалить администратора\n"
         
         await update.message.reply_text(message, parse_mode="Markdown")
-        logger.info(f"Admin {update.effective_user.id} viewed whitelist status")
+        logger.info("Admin %s viewed whitelist status", update.effective_user.id)
         
     except Exception as e:
-        logger.error(f"Error in admin_whitelist_status_command: {e}", exc_info=True)
+        logger.error("Error in admin_whitelist_status_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при получении статуса whitelist.")
 
 
@@ -409,7 +410,7 @@ async def admin_add_admin_command(update: Update, context: ContextTypes.DEFAULT_
                 return
         
         # Add admin to permanent config
-        success = add_admin_to_permanent_config(target_user_id)
+        success = await add_admin_to_permanent_config_async(target_user_id)
         
         if success:
             await update.message.reply_text(
@@ -417,15 +418,15 @@ async def admin_add_admin_command(update: Update, context: ContextTypes.DEFAULT_
                 f"👑 Пользователь теперь имеет права администратора.\n"
                 f"📝 ID администратора добавлен в whitelist_config.py и сохранится после перезапуска бота."
             )
-            logger.info(f"Admin {user_id} added user {target_user_id} as admin")
+            logger.info("Admin %s added user %s as admin", user_id, target_user_id)
         else:
             await update.message.reply_text(
                 f"❌ Ошибка при добавлении администратора {target_user_id}."
             )
-            logger.error(f"Failed to add admin {target_user_id}")
+            logger.error("Failed to add admin %s", target_user_id)
             
     except Exception as e:
-        logger.error(f"Error in admin_add_admin_command: {e}", exc_info=True)
+        logger.error("Error in admin_add_admin_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при выполнении команды.")
 
 
@@ -472,21 +473,21 @@ async def admin_remove_admin_command(update: Update, context: ContextTypes.DEFAU
                 return
         
         # Remove admin from permanent config
-        success = remove_admin_from_permanent_config(target_user_id)
+        success = await remove_admin_from_permanent_config_async(target_user_id)
         
         if success:
             await update.message.reply_text(
                 f"✅ Пользователь {target_user_id} удален из списка администраторов.\n\n"
                 f"🔄 Изменения сохранены в whitelist_config.py."
             )
-            logger.info(f"Admin {user_id} removed user {target_user_id} from admin list")
+            logger.info("Admin %s removed user %s from admin list", user_id, target_user_id)
         else:
             await update.message.reply_text(
                 f"❌ Ошибка при удалении администратора {target_user_id}."
             )
-            logger.error(f"Failed to remove admin {target_user_id}")
+            logger.error("Failed to remove admin %s", target_user_id)
             
     except Exception as e:
-        logger.error(f"Error in admin_remove_admin_command: {e}", exc_info=True)
+        logger.error("Error in admin_remove_admin_command: %s", e, exc_info=True)
         await update.message.reply_text("❌ Произошла ошибка при выполнении команды.")
 
@@ -28,6 +28,8 @@ class Settings:
         self.upload_dir: str = os.getenv("UPLOAD_DIR", "uploads")
         self.elevenlabs_model: str = os.getenv("ELEVEN_LABS_MODEL", "scribe_v1")
         self.polling_interval: float = float(os.getenv("POLLING_INTERVAL", "1.0"))
+        self.max_sessions: int = int(os.getenv("MAX_SESSIONS", "10000"))
+        self.session_ttl: float = float(os.getenv("SESSION_TTL", "86400"))  # Idle seconds before eviction
         
         # FastAPI/Web server settings
         self.host: str = os.getenv("HOST", "0.0.0.0")
@@ -1,9 +1,13 @@
 """
 Main audio processing service that coordinates transcription and grammar checking
 """
+import asyncio
 import logging
 import os
-from typing import Dict, Any
+import shutil
+from typing import Dict, Any, Optional, AsyncIterator
+
+import httpx
 from telegram import Message
 
 from app.config import settings
@@ -13,6 +17,20 @@ from app.utils.file_handler import FileHandler
 
 logger = logging.getLogger(__name__)
 
+
+# Resolved once; audio is uploaded unconverted when ffmpeg is not installed
+_FFMPEG = shutil.which("ffmpeg")
+
+# Caps concurrent ffmpeg transcodes so a burst of uploads can't oversubscribe
+# the container's CPU limit (cpus: "2.0" in docker-compose.yml)
+_TRANSCODE_SLOTS = asyncio.Semaphore(2)
+
+
+def _failed(error: str) -> Dict[str, Any]:
+    """Build the terminal stage event for a failed pipeline"""
+    return {"stage": "failed", "result": {"success": False, "error": error}}
+
+
 class AudioProcessor:
     """
     Main service that orchestrates the complete audio processing pipeline:
@@ -22,10 +40,16 @@ class AudioProcessor:
     4. Return results to user
     """
     
-    def __init__(self):
-        """Initialize the audio processor with all required clients"""
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize the audio processor with all required clients
+        
+        Args:
+            http_client: Optional shared async HTTP client; its connection pool
+                is reused by the OpenAI client. The caller owns and closes it.
+        """
         self.elevenlabs_client = ElevenLabsClient()
-        self.openai_client = OpenAIClient()
+        self.openai_client = OpenAIClient(http_client=http_client)
         self.file_handler = FileHandler()
         
         logger.info("Audio processor initialized with ElevenLabs and OpenAI clients")
@@ -49,7 +73,32 @@ class AudioProcessor:
                 "error": str (if failed)
             }
         """
+        result = {"success": False, "error": "Processing did not complete"}
+        async for event in self.process_audio_stages(message):
+            if "result" in event:
+                result = event["result"]
+        return result
+    
+    async def process_audio_stages(self, message: Message) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process an audio message, reporting each pipeline stage as it finishes
+        
+        Lets the caller give the user feedback (e.g. "transcribed, checking
+        grammar") before the whole pipeline is done.
+        
+        Args:
+            message: Telegram message containing audio
+            
+        Yields:
+            Stage events, in order:
+            {"stage": "download_done"}
+            {"stage": "transcription_done", "original_text": str}
+            {"stage": "grammar_done", "result": Dict}  (same shape as process_audio_message)
+            On failure a single {"stage": "failed", "result": {"success": False, "error": str}}
+            is yielded instead and the generator stops.
+        """
         audio_file_path = None
+        speech_file_path = None
         
         try:
             logger.info("Starting audio message processing")
@@ -57,30 +106,47 @@ class AudioProcessor:
             # Step 1: Download and validate audio file
             audio_file_path = await self._download_audio_file(message)
             if not audio_file_path:
-                return {"success": False, "error": "Failed to download audio file"}
+                yield _failed("Failed to download audio file")
+                return
             
             # Step 2: Validate the audio file
             validation_result = self.file_handler.validate_audio_file(audio_file_path)
             if not validation_result["valid"]:
-                return {"success": False, "error": validation_result["error"]}
+                yield _failed(validation_result["error"])
+                return
+            
+            yield {"stage": "download_done"}
+            
+            # Voice messages are already small mono Opus; other audio is
+            # re-encoded to 16 kHz mono to shrink the upload
+            if not message.voice:
+                speech_file_path = await self._downsample_for_transcription(audio_file_path)
             
             # Step 3: Transcribe audio using ElevenLabs
             logger.info("Starting audio transcription...")
             transcription_result = await self.elevenlabs_client.transcribe_with_retry(
-                file_path=audio_file_path,
+                file_path=speech_file_path or audio_file_path,
                 language_code="auto",  # Auto-detect language
                 max_retries=2
             )
             
             if not transcription_result.get("success"):
-                return {
-                    "success": False, 
-                    "error": f"Transcription failed: {transcription_result.get('error')}"
-                }
+                yield _failed(f"Transcription failed: {transcription_result.get('error')}")
+                return
             
             original_text = transcription_result.get("text", "").strip()
             if not original_text:
-                return {"success": False, "error": "No speech detected in audio file"}
+                yield _failed("No speech detected in audio file")
+                return
+            
+            # The audio files are no longer needed once transcribed
+            self.file_handler.cleanup_file(audio_file_path)
+            audio_file_path = None
+            if speech_file_path:
+                self.file_handler.cleanup_file(speech_file_path)
+                speech_file_path = None
+            
+            yield {"stage": "transcription_done", "original_text": original_text}
             
             # Step 4: Check grammar using OpenAI
             logger.info("Starting grammar check...")
@@ -94,7 +160,7 @@ class AudioProcessor:
             if grammar_result.get("success"):
                 corrected_text = grammar_result.get("corrected_text", original_text)
             else:
-                logger.warning(f"Grammar check failed: {grammar_result.get('error')}")
+                logger.warning("Grammar check failed: %s", grammar_result.get('error'))
                 corrected_text = original_text
             
             # Step 5: Compile final results
@@ -117,16 +183,68 @@ class AudioProcessor:
                 result["audio_events"] = transcription_result["audio_events"]
             
             logger.info("Audio processing completed successfully")
-            return result
+            yield {"stage": "grammar_done", "result": result}
             
         except Exception as e:
-            logger.error(f"Error processing audio message: {e}", exc_info=True)
-            return {"success": False, "error": f"Processing failed: {str(e)}"}
+            logger.error("Error processing audio message: %s", e, exc_info=True)
+            yield _failed(f"Processing failed: {str(e)}")
         
         finally:
-            # Always clean up the temporary audio file
+            # Always clean up the temporary audio files
             if audio_file_path:
                 self.file_handler.cleanup_file(audio_file_path)
+            if speech_file_path:
+                self.file_handler.cleanup_file(speech_file_path)
+    
+    async def _downsample_for_transcription(self, file_path: str) -> Optional[str]:
+        """
+        Re-encode audio to 16 kHz mono Opus for a smaller transcription upload
+        
+        Speech recognition works at 16 kHz mono, so higher sample rates and
+        extra channels only add upload time.
+        
+        Args:
+            file_path: Path to the downloaded audio file
+            
+        Returns:
+            Path to the smaller copy, or None to upload the original
+            (ffmpeg missing, conversion failed, or no size saving)
+        """
+        if not _FFMPEG:
+            return None
+        
+        async with _TRANSCODE_SLOTS:
+            output_path = self.file_handler.create_temp_file(suffix=".ogg", prefix="speech_16k_")
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    _FFMPEG, "-nostdin", "-y", "-loglevel", "error",
+                    "-i", file_path,
+                    "-vn", "-ac", "1", "-ar", "16000", "-c:a", "libopus", "-b:a", "24k",
+                    output_path,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE
+                )
+                try:
+                    _, stderr = await process.communicate()
+                except asyncio.CancelledError:
+                    # Don't leave ffmpeg running when the request is abandoned
+                    if process.returncode is None:
+                        process.kill()
+                    await process.wait()
+                    self.file_handler.cleanup_file(output_path)
+                    raise
+                
+                if process.returncode != 0:
+                    logger.warning("Downsampling failed, uploading original: %s", stderr.decode(errors='replace').strip())
+                elif os.path.getsize(output_path) < os.path.getsize(file_path):
+                    logger.info("Downsampled audio for transcription: %s", output_path)
+                    return output_path
+                
+            except Exception as e:
+                logger.warning("Downsampling failed, uploading original: %s", e)
+            
+            self.file_handler.cleanup_file(output_path)
+            return None
     
     async def _download_audio_file(self, message: Message) -> str:
         """
@@ -163,15 +281,21 @@ class AudioProcessor:
                 prefix="telegram_audio_"
             )
             
-            # Download the file
-            telegram_file = await audio_file.get_file()
-            await telegram_file.download_to_drive(temp_file_path)
+            # Download the file, removing the temp file if it fails
+            try:
+                telegram_file = await audio_file.get_file()
+                await telegram_file.download_to_drive(temp_file_path)
+            except Exception:
+                self.file_handler.cleanup_file(temp_file_path)
+                raise
             
-            logger.info(f"Audio file downloaded: {temp_file_path} ({os.path.getsize(temp_file_path)} bytes)")
+            if logger.isEnabledFor(logging.INFO):
+                # getsize() is a stat() call; skip it when INFO is disabled
+                logger.info("Audio file downloaded: %s (%s bytes)", temp_file_path, os.path.getsize(temp_file_path))
             return temp_file_path
             
         except Exception as e:
-            logger.error(f"Error downloading audio file: {e}")
+            logger.error("Error downloading audio file: %s", e)
             return None
     
     def _get_file_extension(self, filename: str) -> str:
@@ -66,17 +66,17 @@ class ElevenLabsClient:
         self.model_id = settings.elevenlabs_model
         
         # Debug: Log API type for troubleshooting
-        logger.info(f"Using {'modern function-based' if self.use_modern_api else 'legacy client-based'} ElevenLabs API")
+        logger.info("Using %s ElevenLabs API", 'modern function-based' if self.use_modern_api else 'legacy client-based')
         if not self.use_modern_api and self.client:
-            logger.info(f"Client methods: {[attr for attr in dir(self.client) if not attr.startswith('_')]}")
+            logger.info("Client methods: %s", [attr for attr in dir(self.client) if not attr.startswith('_')])
             if hasattr(self.client, 'speech_to_text'):
-                logger.info(f"speech_to_text methods: {[attr for attr in dir(self.client.speech_to_text) if not attr.startswith('_')]}")
+                logger.info("speech_to_text methods: %s", [attr for attr in dir(self.client.speech_to_text) if not attr.startswith('_')])
         
         # Rate limiting configuration
         self.requests_per_minute = 60  # Adjust based on your plan
         self.request_timestamps: List[float] = []
         
-        logger.info(f"ElevenLabs client initialized with model: {self.model_id}")
+        logger.info("ElevenLabs client initialized with model: %s", self.model_id)
     
     async def transcribe_audio(
         self, 
@@ -114,7 +114,7 @@ class ElevenLabsClient:
             # Check rate limits
             await self._check_rate_limits()
             
-            logger.info(f"Starting transcription: {file_path}")
+            logger.info("Starting transcription: %s", file_path)
             start_time = time.time()
             
             # Prepare transcription parameters
@@ -130,7 +130,7 @@ class ElevenLabsClient:
             transcription_params = {k: v for k, v in transcription_params.items() if v is not None}
             
             # Perform transcription (run in thread to avoid blocking)
-            result = await asyncio.get_event_loop().run_in_executor(
+            result = await asyncio.get_running_loop().run_in_executor(
                 None, 
                 self._transcribe_sync, 
                 file_path, 
@@ -140,7 +140,7 @@ class ElevenLabsClient:
             processing_time = time.time() - start_time
             
             if result:
-                logger.info(f"Transcription completed in {processing_time:.2f}s")
+                logger.info("Transcription completed in %.2fs", processing_time)
                 
                 # Parse the response
                 transcription_result = {
@@ -180,11 +180,11 @@ class ElevenLabsClient:
                 logger.error("File too large")
                 return {"success": False, "error": "Audio file is too large"}
             else:
-                logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
+                logger.error("HTTP error %s: %s", e.response.status_code, e.response.text)
                 return {"success": False, "error": f"API error: {e.response.status_code}"}
                 
         except Exception as e:
-            logger.error(f"Unexpected error during transcription: {e}", exc_info=True)
+            logger.error("Unexpected error during transcription: %s", e, exc_info=True)
             return {"success": False, "error": f"Transcription failed: {str(e)}"}
     
     def _transcribe_sync(self, file_path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -233,7 +233,7 @@ class ElevenLabsClient:
                             return self._transcribe_with_requests(file_path, params)
                         
                 except (AttributeError, TypeError, NameError) as e:
-                    logger.info(f"Client method failed ({e}), using HTTP fallback")
+                    logger.info("Client method failed (%s), using HTTP fallback", e)
                     return self._transcribe_with_requests(file_path, params)
                 
                 # Process the response
@@ -323,7 +323,7 @@ class ElevenLabsClient:
                 return result
                 
         except Exception as e:
-            logger.error(f"Sync transcription error: {e}")
+            logger.error("Sync transcription error: %s", e)
             return None
     
     def _transcribe_with_requests(self, file_path: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -365,15 +365,15 @@ class ElevenLabsClient:
                         if params.get("language_code") and params["language_code"] != "auto":
                             data["language_code"] = params["language_code"]
                         
-                        logger.info(f"Making HTTP request to {endpoint_url}")
+                        logger.info("Making HTTP request to %s", endpoint_url)
                         response = requests.post(endpoint_url, headers=headers, files=files, data=data, timeout=30)
                         
                         if response.status_code != 200:
-                            logger.error(f"Response content: {response.text}")
+                            logger.error("Response content: %s", response.text)
                             # Try to parse error message
                             try:
                                 error_data = response.json()
-                                logger.error(f"Parsed error: {error_data}")
+                                logger.error("Parsed error: %s", error_data)
                             except:
                                 pass
                         
@@ -389,7 +389,7 @@ class ElevenLabsClient:
                         
                 except requests.exceptions.RequestException as e:
                     last_error = e
-                    logger.warning(f"Endpoint {endpoint_url} failed: {e}")
+                    logger.warning("Endpoint %s failed: %s", endpoint_url, e)
                     continue
             
             # If all endpoints failed, raise the last error
@@ -399,7 +399,7 @@ class ElevenLabsClient:
             return None
                     
         except Exception as e:
-            logger.error(f"HTTP fallback transcription failed: {e}")
+            logger.error("HTTP fallback transcription failed: %s", e)
             return None
     
     async def transcribe_with_retry(
@@ -425,13 +425,13 @@ class ElevenLabsClient:
         
         for attempt in range(max_retries + 1):
             try:
-                logger.info(f"Transcription attempt {attempt + 1}/{max_retries + 1}")
+                logger.info("Transcription attempt %s/%s", attempt + 1, max_retries + 1)
                 
                 result = await self.transcribe_audio(file_path, language_code)
                 
                 if result.get("success"):
                     if attempt > 0:
-                        logger.info(f"Transcription succeeded after {attempt + 1} attempts")
+                        logger.info("Transcription succeeded after %s attempts", attempt + 1)
                     result["retry_attempts"] = attempt
                     return result
                 
@@ -446,25 +446,25 @@ class ElevenLabsClient:
                 ]
                 
                 if any(err in last_error for err in non_retryable_errors):
-                    logger.error(f"Non-retryable error: {last_error}")
+                    logger.error("Non-retryable error: %s", last_error)
                     break
                 
                 if attempt < max_retries:
                     # Exponential backoff with jitter
                     delay = retry_delay * (2 ** attempt) + (time.time() % 1)
-                    logger.warning(f"Attempt {attempt + 1} failed: {last_error}. Retrying in {delay:.1f}s...")
+                    logger.warning("Attempt %s failed: %s. Retrying in %.1fs...", attempt + 1, last_error, delay)
                     await asyncio.sleep(delay)
                 
             except Exception as e:
                 last_error = str(e)
-                logger.error(f"Attempt {attempt + 1} exception: {e}")
+                logger.error("Attempt %s exception: %s", attempt + 1, e)
                 
                 if attempt < max_retries:
                     delay = retry_delay * (2 ** attempt)
                     await asyncio.sleep(delay)
         
         # All attempts failed
-        logger.error(f"All transcription attempts failed. Last error: {last_error}")
+        logger.error("All transcription attempts failed. Last error: %s", last_error)
         return {
             "success": False,
             "error": f"Transcription failed after {max_retries + 1} attempts: {last_error}",
@@ -484,7 +484,7 @@ class ElevenLabsClient:
         # Check if we're at the rate limit
         if len(self.request_timestamps) >= self.requests_per_minute:
             sleep_time = 60 - (current_time - self.request_timestamps[0])
-            logger.warning(f"Rate limit reached. Waiting {sleep_time:.1f}s...")
+            logger.warning("Rate limit reached. Waiting %.1fs...", sleep_time)
             await asyncio.sleep(sleep_time)
             
         # Record this request
@@ -587,7 +587,7 @@ class ElevenLabsClient:
         try:
             # Try to make a simple API request to check connectivity
             if self.client and hasattr(self.client, 'user') and hasattr(self.client.user, 'get'):
-                user_info = await asyncio.get_event_loop().run_in_executor(
+                user_info = await asyncio.get_running_loop().run_in_executor(
                     None, 
                     lambda: self.client.user.get()
                 )
@@ -625,7 +625,7 @@ class ElevenLabsClient:
                     }
             
         except Exception as e:
-            logger.error(f"ElevenLabs health check failed: {e}")
+            logger.error("ElevenLabs health check failed: %s", e)
             return {
                 "healthy": False,
                 "api_accessible": False,
@@ -7,6 +7,8 @@ import asyncio
 import time
 import json
 from typing import Dict, Any, List, Optional
+import httpx
+from cachetools import TTLCache
 from pydantic import BaseModel, Field
 
 from openai import AsyncOpenAI
@@ -56,8 +58,13 @@ class OpenAIClient:
     - Response validation and cleaning
     """
     
-    def __init__(self):
-        """Initialize OpenAI client with API key"""
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Initialize OpenAI client with API key
+        
+        Args:
+            http_client: Optional shared httpx.AsyncClient to reuse its connection pool
+        """
         
         # Validate API key
         if not settings.openai_api_key:
@@ -65,10 +72,10 @@ class OpenAIClient:
         
         # Initialize OpenAI client
         try:
-            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
-            logger.info(f"OpenAI client initialized with model: {settings.openai_model}")
+            self.client = AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
+            logger.info("OpenAI client initialized with model: %s", settings.openai_model)
         except Exception as e:
-            logger.error(f"Failed to initialize OpenAI client: {e}")
+            logger.error("Failed to initialize OpenAI client: %s", e)
             raise ValueError(f"OpenAI initialization failed: {e}")
         
         # Model configuration
@@ -76,7 +83,14 @@ class OpenAIClient:
         self.temperature = 0.1  # Low temperature for consistent grammar correction
         self.max_tokens = 4096
         
-        logger.info(f"OpenAI client initialized successfully")
+        # The schema never changes; serialize it once for every prompt
+        self._grammar_schema_json = json.dumps(self._create_grammar_schema(), indent=2)
+        
+        # Successful grammar results keyed by (whitespace-normalized text, context),
+        # so repeated transcripts skip the API round-trip
+        self._grammar_cache: TTLCache = TTLCache(maxsize=2048, ttl=24 * 3600)
+        
+        logger.info("OpenAI client initialized successfully")
     
     def _create_grammar_schema(self) -> Dict[str, Any]:
         """
@@ -141,8 +155,6 @@ class OpenAIClient:
             Formatted prompt for the AI model optimized for structured output
         """
         
-        schema = self._create_grammar_schema()
-        
         base_prompt = f"""You are a professional editor and grammar expert. Analyze the provided text and return a comprehensive grammar analysis.
 
 Your task is to:
@@ -169,7 +181,7 @@ RULES:
 "{text}"
 
 You MUST respond with valid JSON matching this exact schema:
-{json.dumps(schema, indent=2)}
+{self._grammar_schema_json}
 
 Respond ONLY with the JSON object, no additional text."""
         
@@ -244,7 +256,7 @@ Respond ONLY with the JSON object, no additional text."""
             if not text or not text.strip():
                 return {"success": False, "error": "Empty text provided"}
             
-            logger.info(f"Starting structured grammar check for text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+            logger.info("Starting structured grammar check for text: '%s%s'", text[:50], '...' if len(text) > 50 else '')
             start_time = time.time()
             
             # Create optimized prompt for structured output
@@ -271,7 +283,7 @@ Respond ONLY with the JSON object, no additional text."""
             try:
                 raw_response = response.choices[0].message.content.strip()
                 
-                logger.debug(f"Raw response preview: {raw_response[:100]}...")
+                logger.debug("Raw response preview: %s...", raw_response[:100])
                 
                 if not raw_response:
                     logger.error("Empty response from OpenAI")
@@ -285,7 +297,7 @@ Respond ONLY with the JSON object, no additional text."""
                     try:
                         analysis = GrammarAnalysisResponse(**parsed_response)
                     except Exception as validation_error:
-                        logger.warning(f"Pydantic validation failed: {validation_error}, using raw parsed data")
+                        logger.warning("Pydantic validation failed: %s, using raw parsed data", validation_error)
                     
                     # Convert to output format
                     grammar_issues_formatted = []
@@ -312,19 +324,19 @@ Respond ONLY with the JSON object, no additional text."""
                         "processing_time": processing_time
                     }
                     
-                    logger.info(f"Structured grammar check completed in {processing_time:.2f}s with {parsed_response.get('improvements_made', 0)} improvements")
+                    logger.info("Structured grammar check completed in %.2fs with %s improvements", processing_time, parsed_response.get('improvements_made', 0))
                     return result
                     
                 except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse structured JSON response: {e}")
+                    logger.warning("Failed to parse structured JSON response: %s", e)
                     return self._fallback_to_legacy_parsing(text, raw_response, processing_time)
                     
             except Exception as parse_error:
-                logger.error(f"Error parsing OpenAI response: {parse_error}")
+                logger.error("Error parsing OpenAI response: %s", parse_error)
                 return {"success": False, "error": f"Failed to parse OpenAI response: {parse_error}"}
             
         except Exception as e:
-            logger.error(f"Structured grammar check error: {e}", exc_info=True)
+            logger.error("Structured grammar check error: %s", e, exc_info=True)
             return {
                 "success": False, 
                 "error": f"Grammar check failed: {str(e)}",
@@ -367,7 +379,7 @@ Respond ONLY with the JSON object, no additional text."""
             if not text or not text.strip():
                 return {"success": False, "error": "Empty text provided"}
             
-            logger.info(f"Starting grammar check for text: '{text[:50]}{'...' if len(text) > 50 else ''}'")
+            logger.info("Starting grammar check for text: '%s%s'", text[:50], '...' if len(text) > 50 else '')
             start_time = time.time()
             
             # Create prompt
@@ -397,20 +409,20 @@ Respond ONLY with the JSON object, no additional text."""
                 if not raw_response:
                     return {"success": False, "error": "Empty response text from OpenAI"}
                 
-                logger.info(f"Raw response (first 200 chars): {raw_response[:200]}...")
+                logger.info("Raw response (first 200 chars): %s...", raw_response[:200])
                 
             except Exception as parse_error:
-                logger.error(f"Error parsing OpenAI response: {parse_error}")
+                logger.error("Error parsing OpenAI response: %s", parse_error)
                 return {"success": False, "error": f"Failed to parse OpenAI response: {parse_error}"}
             
             # Parse JSON response
             result = self._parse_json_response(raw_response, text, processing_time)
             
-            logger.info(f"Grammar check completed in {processing_time:.2f}s")
+            logger.info("Grammar check completed in %.2fs", processing_time)
             return result
             
         except Exception as e:
-            logger.error(f"Grammar check error: {e}", exc_info=True)
+            logger.error("Grammar check error: %s", e, exc_info=True)
             return {
                 "success": False, 
                 "error": f"Grammar check failed: {str(e)}",
@@ -460,11 +472,11 @@ Respond ONLY with the JSON object, no additional text."""
                             parsed.get("corrected") or "")
             
             # Debug logging
-            logger.debug(f"Parsed JSON successfully. Corrected text: {corrected_text[:100] if corrected_text else 'None'}...")
+            logger.debug("Parsed JSON successfully. Corrected text: %s...", corrected_text[:100] if corrected_text else 'None')
             
             # If we didn't get corrected text, something is wrong with the JSON structure
             if not corrected_text:
-                logger.warning(f"No corrected text found in parsed JSON. Keys available: {list(parsed.keys())}")
+                logger.warning("No corrected text found in parsed JSON. Keys available: %s", list(parsed.keys()))
                 corrected_text = original_text
             
             grammar_issues = (parsed.get("grammar_issues") or 
@@ -517,7 +529,7 @@ Respond ONLY with the JSON object, no additional text."""
             }
             
         except json.JSONDecodeError as e:
-            logger.warning(f"JSON parsing failed: {e}. Using original text as fallback.")
+            logger.warning("JSON parsing failed: %s. Using original text as fallback.", e)
             
             return {
                 "success": True,
@@ -530,7 +542,7 @@ Respond ONLY with the JSON object, no additional text."""
                 "confidence_score": 0.70  # Lower confidence for fallback
             }
         except Exception as e:
-            logger.error(f"Error parsing JSON response: {e}")
+            logger.error("Error parsing JSON response: %s", e)
             return {
                 "success": False,
                 "error": f"Failed to parse response: {str(e)}",
@@ -556,18 +568,25 @@ Respond ONLY with the JSON object, no additional text."""
         Returns:
             Grammar check result with retry information
         """
+        cache_key = (" ".join(text.split()), context)
+        cached = self._grammar_cache.get(cache_key)
+        if cached is not None:
+            logger.info("Grammar check served from cache")
+            return dict(cached)
+        
         last_error = None
         
         for attempt in range(max_retries + 1):
             try:
-                logger.info(f"Grammar check attempt {attempt + 1}/{max_retries + 1}")
+                logger.info("Grammar check attempt %s/%s", attempt + 1, max_retries + 1)
                 
                 result = await self.check_grammar_structured(text, context)
                 
                 if result.get("success"):
                     if attempt > 0:
-                        logger.info(f"Grammar check succeeded after {attempt + 1} attempts")
+                        logger.info("Grammar check succeeded after %s attempts", attempt + 1)
                     result["retry_attempts"] = attempt
+                    self._grammar_cache[cache_key] = dict(result)
                     return result
                 
                 last_error = result.get("error", "Unknown error")
@@ -580,34 +599,34 @@ Respond ONLY with the JSON object, no additional text."""
                 ]
                 
                 if any(err.lower() in last_error.lower() for err in non_retryable_errors):
-                    logger.error(f"Non-retryable error: {last_error}")
+                    logger.error("Non-retryable error: %s", last_error)
                     break
                 
                 if attempt < max_retries:
                     # Exponential backoff with jitter
                     delay = retry_delay * (2 ** attempt) + (time.time() % 1)
-                    logger.warning(f"Attempt {attempt + 1} failed: {last_error}. Retrying in {delay:.1f}s...")
+                    logger.warning("Attempt %s failed: %s. Retrying in %.1fs...", attempt + 1, last_error, delay)
                     await asyncio.sleep(delay)
                 
             except (RateLimitError, APIConnectionError) as e:
                 last_error = str(e)
-                logger.error(f"Attempt {attempt + 1} API error: {e}")
+                logger.error("Attempt %s API error: %s", attempt + 1, e)
                 
                 if attempt < max_retries:
                     delay = retry_delay * (2 ** attempt)
-                    logger.warning(f"Retrying in {delay:.1f}s...")
+                    logger.warning("Retrying in %.1fs...", delay)
                     await asyncio.sleep(delay)
                     
             except Exception as e:
                 last_error = str(e)
-                logger.error(f"Attempt {attempt + 1} exception: {e}")
+                logger.error("Attempt %s exception: %s", attempt + 1, e)
                 
                 if attempt < max_retries:
                     delay = retry_delay * (2 ** attempt)
                     await asyncio.sleep(delay)
         
         # All attempts failed
-        logger.error(f"All grammar check attempts failed. Last error: {last_error}")
+        logger.error("All grammar check attempts failed. Last error: %s", last_error)
         return {
             "success": False,
             "error": f"Grammar check failed after {max_retries + 1} attempts: {last_error}",
@@ -647,7 +666,7 @@ Respond ONLY with the JSON object, no additional text."""
                 }
                 
         except Exception as e:
-            logger.error(f"OpenAI health check failed: {e}")
+            logger.error("OpenAI health check failed: %s", e)
             return {
                 "healthy": False,
                 "error": f"OpenAI health check failed: {str(e)}"
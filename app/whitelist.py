@@ -5,15 +5,49 @@ Whitelist Management Module
 This module provides functions for managing the whitelist system,
 including permanent modifications to the configuration file.
 """
-import re
+import ast
+import asyncio
+import functools
+import json
 import os
 import shutil
+import threading
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Tuple
+from cachetools import TTLCache
 from app.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Config file locations
+_WRITABLE_CONFIG_FILE = Path("/app/config/whitelist_config.py")  # Docker volume
+_PROJECT_CONFIG_FILE = Path(__file__).parent.parent / "whitelist_config.py"
+
+
+def _bootstrap_writable_config():
+    """
+    Copy a read-only project whitelist_config.py to the writable Docker location
+    
+    Runs once at import time, before the config module is loaded, so later
+    edits always have a writable file to work with.
+    """
+    writable_dir = _WRITABLE_CONFIG_FILE.parent
+    if _WRITABLE_CONFIG_FILE.exists() or not _PROJECT_CONFIG_FILE.exists():
+        return
+    if os.access(_PROJECT_CONFIG_FILE, os.W_OK):
+        return
+    if not (writable_dir.exists() and os.access(writable_dir, os.W_OK)):
+        return
+    
+    try:
+        shutil.copy2(_PROJECT_CONFIG_FILE, _WRITABLE_CONFIG_FILE)
+        logger.info(f"Copied whitelist_config.py to writable location: {_WRITABLE_CONFIG_FILE}")
+    except OSError as e:
+        logger.warning(f"Could not copy whitelist_config.py to writable location: {e}")
+
+
+_bootstrap_writable_config()
+
 # Import whitelist config
 # Try writable location first, then original location
 config = None
@@ -40,12 +74,45 @@ except ImportError:
 # Import database
 from app.db import db
 
+# Cached lookup sets derived from the loaded config
+# Rebuilt by _rebuild_access_sets() whenever the config is (re)loaded
+_ADMIN_IDS_SET = set()
+_AUTH_IDS_SET = set()
+_AUTH_USERNAMES_SET = set()  # Lowercased usernames
+_ENABLE_WHITELIST = False
+
+# Guards read-modify-write cycles on whitelist_config.py
+_config_lock = threading.Lock()
+
+# Memoized whitelist membership for is_authorized(), keyed by (user_id, username)
+# and cleared on every whitelist change. Blocked status is never cached. Locked
+# because config edits run in worker threads.
+_access_cache = TTLCache(maxsize=4096, ttl=60)
+_access_cache_lock = threading.Lock()
+
+
+def _clear_access_cache():
+    """Drop all memoized access decisions"""
+    with _access_cache_lock:
+        _access_cache.clear()
+
+
+def _rebuild_access_sets():
+    """Rebuild the cached lookup sets and flags from the current config module"""
+    global _ADMIN_IDS_SET, _AUTH_IDS_SET, _AUTH_USERNAMES_SET, _ENABLE_WHITELIST
+    _ENABLE_WHITELIST = bool(getattr(config, 'ENABLE_WHITELIST', False))
+    _ADMIN_IDS_SET = set(getattr(config, 'ADMIN_USER_IDS', []))
+    _AUTH_IDS_SET = set(getattr(config, 'AUTHORIZED_USER_IDS', []))
+    _AUTH_USERNAMES_SET = {u.lower() for u in getattr(config, 'AUTHORIZED_USERNAMES', [])}
+    _clear_access_cache()
+
+
+_rebuild_access_sets()
+
 
 def is_admin(user_id: int) -> bool:
     """Check if a user is an admin"""
-    if not config or not hasattr(config, 'ADMIN_USER_IDS'):
-        return False
-    return user_id in config.ADMIN_USER_IDS
+    return user_id in _ADMIN_IDS_SET
 
 
 def check_user_access(user_id: int) -> bool:
@@ -55,67 +122,80 @@ def check_user_access(user_id: int) -> bool:
         return False
     
     # Admins always have access (even if not in whitelist)
-    if is_admin(user_id):
+    if user_id in _ADMIN_IDS_SET:
         return True
     
-    # If whitelist is enabled, check if user is authorized
-    if config and hasattr(config, 'ENABLE_WHITELIST') and config.ENABLE_WHITELIST:
-        if hasattr(config, 'AUTHORIZED_USER_IDS'):
-            return user_id in config.AUTHORIZED_USER_IDS
-    
     # If whitelist is disabled, allow all non-blocked users
-    return True
+    return not _ENABLE_WHITELIST or user_id in _AUTH_IDS_SET
 
 
 def check_username_access(username: str) -> bool:
     """Check if username has access to the bot"""
-    if not username or not config:
+    if not username or not _ENABLE_WHITELIST:
         return False
     
-    if not hasattr(config, 'ENABLE_WHITELIST') or not config.ENABLE_WHITELIST:
-        return False
+    return username.lower() in _AUTH_USERNAMES_SET
+
+
+def is_authorized(user) -> bool:
+    """
+    Check whether a Telegram user may use the bot
     
-    if not hasattr(config, 'AUTHORIZED_USERNAMES'):
-        return False
+    The blocked-user check runs on every call so block/unblock take effect
+    immediately; only the whitelist membership result is memoized for 60s.
+    
+    Args:
+        user: The Telegram user (anything with .id and .username)
+        
+    Returns:
+        True if the user may use the bot
+    """
+    user_id = user.id
+    username = user.username or ""
+    key = (user_id, username)
+    with _access_cache_lock:
+        listed = _access_cache.get(key)
     
-    return username.lower() in [u.lower() for u in config.AUTHORIZED_USERNAMES]
+    if listed is None:
+        listed = (
+            user_id in _ADMIN_IDS_SET
+            or not _ENABLE_WHITELIST
+            or user_id in _AUTH_IDS_SET,
+            _ENABLE_WHITELIST
+            and bool(username)
+            and username.lower() in _AUTH_USERNAMES_SET,
+        )
+        with _access_cache_lock:
+            _access_cache[key] = listed
+    
+    by_id, by_username = listed
+    return (by_id and not db.is_user_blocked(user_id)) or by_username
 
 
+@functools.lru_cache(maxsize=None)
 def _get_config_file_path() -> Path:
-    """Get the path to the whitelist_config.py file"""
+    """
+    Get the path to the whitelist_config.py file
+    
+    Pure lookup, resolved once and cached. Copying a read-only config to the
+    writable Docker location is done up front by _bootstrap_writable_config().
+    """
     # In Docker, use writable config directory first (mounted volume)
-    writable_config = Path("/app/config/whitelist_config.py")
-    if writable_config.exists() and os.access(writable_config.parent, os.W_OK):
-        logger.info(f"Using writable config location: {writable_config}")
-        return writable_config
+    if _WRITABLE_CONFIG_FILE.exists() and os.access(_WRITABLE_CONFIG_FILE.parent, os.W_OK):
+        logger.info(f"Using writable config location: {_WRITABLE_CONFIG_FILE}")
+        return _WRITABLE_CONFIG_FILE
     
     # Try to find the config file in the project root
-    current_dir = Path(__file__).parent.parent
-    config_file = current_dir / "whitelist_config.py"
+    config_file = _PROJECT_CONFIG_FILE
     
     logger.info(f"Checking config file at: {config_file} (exists: {config_file.exists()})")
     
     if config_file.exists():
-        # Check if we can write to it
-        can_write = os.access(config_file, os.W_OK)
-        logger.info(f"Config file writable: {can_write}")
-        
-        # If original exists but is read-only, try to copy to writable location (Docker only)
-        if not can_write:
-            # Try to copy to writable location (Docker)
-            writable_dir = Path("/app/config")
-            if writable_dir.exists() and os.access(writable_dir, os.W_OK):
-                import shutil
-                writable_config = writable_dir / "whitelist_config.py"
-                shutil.copy2(config_file, writable_config)
-                logger.info(f"Copied whitelist_config.py to writable location: {writable_config}")
-                return writable_config
-            else:
-                logger.warning(f"Cannot write to config file and no writable location available: {config_file}")
-        else:
+        if os.access(config_file, os.W_OK):
             # File exists and is writable - use it
             logger.info(f"Using config file: {config_file}")
             return config_file
+        logger.warning(f"Cannot write to config file and no writable location available: {config_file}")
     
     # If file doesn't exist, try current directory
     current_dir_config = Path("whitelist_config.py")
@@ -128,6 +208,29 @@ def _get_config_file_path() -> Path:
     return config_file
 
 
+def _write_config_file(config_file: Path, source: str):
+    """
+    Atomically replace the contents of whitelist_config.py
+
+    The source is written to a temporary file next to the config and moved
+    into place with os.replace, so a crash mid-write never leaves a
+    truncated config behind.
+    """
+    tmp_file = config_file.with_suffix('.py.tmp')
+    try:
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(source)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, config_file)
+    except Exception:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+        raise
+
+
 def _sync_to_project_directory(source_file: Path):
     """
     Sync whitelist_config.py from Docker volume to project directory
@@ -158,7 +261,19 @@ def _sync_to_project_directory(source_file: Path):
 
 
 def _reload_config():
-    """Reload the whitelist configuration module"""
+    """
+    Reload the whitelist configuration module
+    
+    Takes _config_lock so a reload never swaps config out from under an edit
+    that is running in a worker thread. Blocking; call it via asyncio.to_thread
+    from the event loop.
+    """
+    with _config_lock:
+        _reload_config_locked()
+
+
+def _reload_config_locked():
+    """Reload the whitelist configuration module, caller must hold _config_lock"""
     global config
     try:
         import importlib
@@ -167,15 +282,11 @@ def _reload_config():
         logger.info("🔄 Reloading whitelist configuration...")
         
         # Remove old config from sys.modules if it exists
-        # Need to remove all variations that might be cached
-        modules_to_remove = []
-        for key in list(sys.modules.keys()):
-            if key == 'whitelist_config' or key.endswith('.whitelist_config'):
-                modules_to_remove.append(key)
-        
-        for mod in modules_to_remove:
-            del sys.modules[mod]
-            logger.debug(f"Removed cached module: {mod}")
+        # The module is always imported top-level, so probe the known keys
+        # directly instead of scanning every loaded module
+        for mod in {'whitelist_config', getattr(config, '__name__', 'whitelist_config')}:
+            if sys.modules.pop(mod, None) is not None:
+                logger.debug(f"Removed cached module: {mod}")
         
         # Reset config to None to force fresh import
         config = None
@@ -214,111 +325,357 @@ def _reload_config():
         
     except Exception as e:
         logger.error(f"❌ Error reloading config: {e}", exc_info=True)
+    finally:
+        _rebuild_access_sets()
 
 
-def add_user_to_permanent_whitelist(user_id: int) -> bool:
+def _find_config_lists(source: str, filename: str) -> Dict[str, ast.Assign]:
+    """Map each top-level `NAME = [...]` assignment in the config source to its ast node"""
+    tree = ast.parse(source, filename=filename)
+    list_nodes = {}
+    for node in tree.body:
+        if (
+            isinstance(node, ast.Assign)
+            and len(node.targets) == 1
+            and isinstance(node.targets[0], ast.Name)
+            and isinstance(node.value, ast.List)
+        ):
+            list_nodes[node.targets[0].id] = node
+    return list_nodes
+
+
+def _load_config_ast(config_file: Path):
     """
-    Permanently adds a user ID to the whitelist by modifying whitelist_config.py
+    Read whitelist_config.py and locate its top-level list assignments
     
     Args:
-        user_id: The Telegram user ID to add
+        config_file: Path to the config file
         
     Returns:
-        True if successful, False otherwise
+        Tuple of (file source, {variable name: ast.Assign node})
     """
-    try:
-        config_file = _get_config_file_path()
-        
-        logger.info(f"Attempting to add user {user_id} to whitelist config at: {config_file}")
-        logger.info(f"Config file absolute path: {config_file.absolute()}")
-        logger.info(f"Config file exists: {config_file.exists()}")
-        
-        if not config_file.exists():
-            logger.error(f"Config file not found: {config_file}")
-            logger.error(f"Current working directory: {os.getcwd()}")
-            logger.error(f"Config file absolute path: {config_file.absolute()}")
-            return False
-        
-        # Check if we can write to the file
-        if not os.access(config_file, os.W_OK):
-            logger.error(f"Cannot write to config file: {config_file}")
-            try:
-                logger.error(f"File permissions: {oct(config_file.stat().st_mode)}")
-            except:
-                pass
-            return False
-        
-        # Read current config file
-        logger.info(f"Reading config file: {config_file}")
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Check if user ID already exists
-        if f"{user_id}," in content or f"{user_id}]" in content:
-            logger.info(f"User ID {user_id} already in whitelist")
-            return True
-        
-        # Find the AUTHORIZED_USER_IDS section using regex
-        pattern = r'(AUTHORIZED_USER_IDS\s*=\s*\[)(.*?)(\])'
-        match = re.search(pattern, content, re.DOTALL)
-        
-        if not match:
-            logger.error("Could not find AUTHORIZED_USER_IDS section in config file")
-            return False
-        
-        # Get the list content
-        list_content = match.group(2)
-        
-        # Add the new user ID before the closing bracket
-        # Find the last entry and add after it
-        lines = list_content.strip().split('\n')
-        if lines and lines[-1].strip():
-            # Add comma and new entry
-            new_entry = f"    {user_id},"
-            # Insert before the closing bracket
-            replacement = match.group(1) + list_content + '\n' + new_entry + '\n' + match.group(3)
+    with open(config_file, 'r', encoding='utf-8') as f:
+        source = f.read()
+    
+    return source, _find_config_lists(source, str(config_file))
+
+
+def _render_config_entry(value) -> str:
+    """Render a single config list entry as Python source"""
+    return json.dumps(value) if isinstance(value, str) else str(value)
+
+
+def _source_offsets(source: str):
+    """
+    Build a converter from ast (lineno, col_offset) positions to string offsets
+    
+    ast column offsets count UTF-8 bytes, so lines holding non-ASCII text
+    (emoji in comments, unicode usernames) are re-measured in characters.
+    """
+    lines = source.split('\n')
+    starts = [0]
+    for line in lines:
+        starts.append(starts[-1] + len(line) + 1)
+    
+    def to_offset(lineno: int, col: int) -> int:
+        line = lines[lineno - 1]
+        return starts[lineno - 1] + len(line.encode('utf-8')[:col].decode('utf-8', errors='ignore'))
+    
+    return to_offset
+
+
+def _remove_list_entries(source: str, node: ast.Assign, remove_values: list) -> str:
+    """
+    Delete the entries of a config list whose value is in remove_values
+    
+    Only the source of the removed elements is touched. An entry that sits
+    on its own line is dropped together with its inline comment; entries
+    sharing a line lose just their text and separating comma.
+    """
+    to_offset = _source_offsets(source)
+    doomed = [
+        elt for elt in node.value.elts
+        if ast.literal_eval(elt) in remove_values
+    ]
+    
+    # Bottom-up so the spans of earlier elements stay valid
+    for elt in reversed(doomed):
+        start = to_offset(elt.lineno, elt.col_offset)
+        end = to_offset(elt.end_lineno, elt.end_col_offset)
+        
+        after = end
+        while after < len(source) and source[after] in ' \t':
+            after += 1
+        has_comma = after < len(source) and source[after] == ','
+        if has_comma:
+            after += 1
+        
+        line_start = source.rfind('\n', 0, start) + 1
+        line_end = source.find('\n', after)
+        if line_end == -1:
+            line_end = len(source)
+        rest = source[after:line_end].strip()
+        
+        if not source[line_start:start].strip() and (not rest or rest.startswith('#')):
+            # The entry owns the whole line, comment included
+            source = source[:line_start] + source[line_end + 1:]
+        elif has_comma:
+            while after < len(source) and source[after] in ' \t':
+                after += 1
+            source = source[:start] + source[after:]
         else:
-            # Empty list, add first entry
-            new_entry = f"    {user_id},"
-            replacement = match.group(1) + '\n' + new_entry + '\n' + match.group(3)
-        
-        # Replace in content
-        new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        # Write back to file
-        logger.info(f"Writing updated config to: {config_file}")
-        try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            logger.info(f"Successfully wrote to config file: {config_file}")
-        except Exception as write_error:
-            logger.error(f"Failed to write to config file: {write_error}", exc_info=True)
-            return False
-        
-        # Verify the write was successful
-        if not config_file.exists():
-            logger.error(f"Config file disappeared after write: {config_file}")
-            return False
-        
-        # Update runtime configuration
-        _reload_config()
-        
-        # Also update the runtime config object
-        if config and hasattr(config, 'AUTHORIZED_USER_IDS'):
-            if user_id not in config.AUTHORIZED_USER_IDS:
-                config.AUTHORIZED_USER_IDS.append(user_id)
-        
-        # Sync to project directory if running in Docker
-        _sync_to_project_directory(config_file)
-        
-        logger.info(f"User ID {user_id} successfully added to permanent whitelist at {config_file}")
-        return True
+            # Last entry on a shared line: take the comma in front of it instead
+            before = start
+            while before > 0 and source[before - 1] in ' \t\r\n':
+                before -= 1
+            if before > 0 and source[before - 1] == ',':
+                start = before - 1
+            source = source[:start] + source[end:]
+    
+    return source
+
+
+def _append_list_entries(source: str, node: ast.Assign, values: list) -> str:
+    """
+    Insert new entries just before the closing bracket of a config list
+    
+    Multi-line lists get one entry per line at the indentation of the last
+    existing entry; single-line lists are extended in place.
+    """
+    to_offset = _source_offsets(source)
+    entries = [_render_config_entry(value) for value in values]
+    elts = node.value.elts
+    close = to_offset(node.value.end_lineno, node.value.end_col_offset) - 1
+    close_line_start = source.rfind('\n', 0, close) + 1
+    
+    if node.value.lineno != node.value.end_lineno and not source[close_line_start:close].strip():
+        indent = '    '
+        comma_at = None
+        if elts:
+            last = elts[-1]
+            last_start = to_offset(last.lineno, last.col_offset)
+            last_end = to_offset(last.end_lineno, last.end_col_offset)
+            last_line_start = source.rfind('\n', 0, last_start) + 1
+            if not source[last_line_start:last_start].strip():
+                indent = source[last_line_start:last_start]
+            after = last_end
+            while source[after] in ' \t':
+                after += 1
+            if source[after] != ',':
+                comma_at = last_end
+        
+        block = ''.join(f"{indent}{entry},\n" for entry in entries)
+        source = source[:close_line_start] + block + source[close_line_start:]
+        if comma_at is not None:
+            source = source[:comma_at] + ',' + source[comma_at:]
+        return source
+    
+    if elts:
+        last = elts[-1]
+        insert_at = to_offset(last.end_lineno, last.end_col_offset)
+        block = ''.join(f", {entry}" for entry in entries)
+    else:
+        insert_at = close
+        block = ', '.join(entries)
+    return source[:insert_at] + block + source[insert_at:]
+
+
+def _merge_ids(current: list, add_ids: Iterable[int], remove_ids: Iterable[int]) -> Tuple[list, list, list]:
+    """
+    Apply ID additions/removals while keeping the existing order
+    
+    Returns:
+        Tuple of (merged list, IDs actually added, IDs actually removed)
+    """
+    remove_set = set(remove_ids)
+    merged = [uid for uid in current if uid not in remove_set]
+    removed = [uid for uid in current if uid in remove_set]
+    added = []
+    seen = set(merged)
+    for uid in add_ids:
+        if uid not in seen and uid not in remove_set:
+            merged.append(uid)
+            added.append(uid)
+            seen.add(uid)
+    return merged, added, removed
+
+
+def _merge_usernames(current: list, add_usernames: Iterable[str], remove_usernames: Iterable[str]) -> Tuple[list, list, list]:
+    """
+    Apply username additions/removals case-insensitively, keeping the existing order
+    
+    Returns:
+        Tuple of (merged list, usernames actually added, usernames actually removed)
+    """
+    remove_set = {u.lstrip('@').lower() for u in remove_usernames}
+    merged = [u for u in current if u.lower() not in remove_set]
+    removed = [u for u in current if u.lower() in remove_set]
+    added = []
+    seen = {u.lower() for u in merged}
+    for username in add_usernames:
+        username = username.lstrip('@')
+        if username and username.lower() not in seen and username.lower() not in remove_set:
+            merged.append(username)
+            added.append(username)
+            seen.add(username.lower())
+    return merged, added, removed
+
+
+def _update_runtime_list(name: str, new_values: list, added: list, removed: list):
+    """
+    Apply a config list change to the runtime state without re-importing
+    
+    The lookup sets are the authoritative runtime copy and are updated with
+    just the delta; config.<name> is repointed at the freshly serialized list
+    so code reading the config module sees the same data as the file.
+    """
+    if name == 'AUTHORIZED_USERNAMES':
+        lookup = _AUTH_USERNAMES_SET
+        added = [u.lower() for u in added]
+        removed = [u.lower() for u in removed]
+    elif name == 'ADMIN_USER_IDS':
+        lookup = _ADMIN_IDS_SET
+    else:
+        lookup = _AUTH_IDS_SET
+    
+    lookup.difference_update(removed)
+    lookup.update(added)
+    setattr(config, name, new_values)
+    _clear_access_cache()
+
+
+def apply_whitelist_changes(
+    add_ids: Iterable[int] = (),
+    remove_ids: Iterable[int] = (),
+    add_usernames: Iterable[str] = (),
+    remove_usernames: Iterable[str] = (),
+    add_admin_ids: Iterable[int] = (),
+    remove_admin_ids: Iterable[int] = (),
+) -> bool:
+    """
+    Permanently applies a batch of whitelist changes to whitelist_config.py
+    
+    The config file is parsed once, every change is applied to the affected
+    lists in memory and the file is written and reloaded a single time.
+    Only the removed and added entries are edited in the source, so the
+    layout and comments of every other entry are left as they were.
+    
+    Args:
+        add_ids: User IDs to add to AUTHORIZED_USER_IDS
+        remove_ids: User IDs to remove from AUTHORIZED_USER_IDS
+        add_usernames: Usernames to add to AUTHORIZED_USERNAMES
+        remove_usernames: Usernames to remove from AUTHORIZED_USERNAMES
+        add_admin_ids: User IDs to add to ADMIN_USER_IDS
+        remove_admin_ids: User IDs to remove from ADMIN_USER_IDS
         
+    Returns:
+        True if successful (or nothing had to change), False otherwise
+    """
+    try:
+        # Serialize edits - the async wrappers run them in worker threads
+        with _config_lock:
+            config_file = _get_config_file_path()
+            
+            if not config_file.exists():
+                logger.error(f"Config file not found: {config_file}")
+                logger.error(f"Current working directory: {os.getcwd()}")
+                return False
+            
+            # Check if we can write to the file
+            if not os.access(config_file, os.W_OK):
+                logger.error(f"Cannot write to config file: {config_file}")
+                try:
+                    logger.error(f"File permissions: {oct(config_file.stat().st_mode)}")
+                except OSError:
+                    pass
+                return False
+            
+            source, list_nodes = _load_config_ast(config_file)
+            
+            requested = {
+                'AUTHORIZED_USER_IDS': (list(add_ids), list(remove_ids), _merge_ids),
+                'AUTHORIZED_USERNAMES': (list(add_usernames), list(remove_usernames), _merge_usernames),
+                'ADMIN_USER_IDS': (list(add_admin_ids), list(remove_admin_ids), _merge_ids),
+            }
+            
+            # Compute the new contents of every list touched by this batch
+            updates = {}
+            for name, (to_add, to_remove, merge) in requested.items():
+                if not to_add and not to_remove:
+                    continue
+            
+                node = list_nodes.get(name)
+                if node is None:
+                    logger.error(f"Could not find {name} section in config file")
+                    return False
+            
+                current = ast.literal_eval(node.value)
+                new_values, added, removed = merge(current, to_add, to_remove)
+                if added or removed:
+                    updates[name] = (node, new_values, added, removed)
+            
+            if not updates:
+                logger.info("Whitelist already up to date, no changes written")
+                return True
+            
+            # Values every list must hold after the edit, used to verify the splice
+            expected = {name: ast.literal_eval(node.value) for name, node in list_nodes.items()}
+            expected.update({name: update[1] for name, update in updates.items()})
+            
+            # Edit only the spans of removed/added entries so untouched entries keep
+            # their formatting and comments. Removals first, then re-parse and
+            # append, each pass bottom-up so earlier positions stay valid.
+            by_position = sorted(updates.items(), key=lambda item: item[1][0].lineno, reverse=True)
+            for name, (node, _, _, removed) in by_position:
+                if removed:
+                    source = _remove_list_entries(source, node, removed)
+            
+            list_nodes = _find_config_lists(source, str(config_file))
+            for name, (_, _, added, _) in by_position:
+                if added:
+                    source = _append_list_entries(source, list_nodes[name], added)
+            
+            # Only the targeted list nodes may change - refuse to write anything else
+            new_nodes = _find_config_lists(source, str(config_file))
+            actual = {name: ast.literal_eval(node.value) for name, node in new_nodes.items()}
+            if actual != expected:
+                logger.error("Rewritten config does not match the requested changes, not writing it")
+                return False
+            
+            logger.info(f"Writing updated config to: {config_file}")
+            _write_config_file(config_file, source)
+            
+            # Update runtime configuration
+            if config is None:
+                _reload_config_locked()
+            else:
+                for name, (_, new_values, added, removed) in updates.items():
+                    _update_runtime_list(name, new_values, added, removed)
+            
+            # Sync to project directory if running in Docker
+            _sync_to_project_directory(config_file)
+            
+            logger.info(f"Applied whitelist changes to {', '.join(updates)} at {config_file}")
+            return True
+            
     except Exception as e:
-        logger.error(f"Error adding user {user_id} to permanent whitelist: {e}", exc_info=True)
+        logger.error(f"Error applying whitelist changes: {e}", exc_info=True)
         return False
 
 
+def add_user_to_permanent_whitelist(user_id: int) -> bool:
+    """
+    Permanently adds a user ID to the whitelist by modifying whitelist_config.py
+    
+    Args:
+        user_id: The Telegram user ID to add
+        
+    Returns:
+        True if successful, False otherwise
+    """
+    return apply_whitelist_changes(add_ids=[user_id])
+
+
 def remove_user_from_permanent_whitelist(user_id: int) -> bool:
     """
     Permanently removes a user ID from the whitelist by modifying whitelist_config.py
@@ -329,48 +686,12 @@ def remove_user_from_permanent_whitelist(user_id: int) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        config_file = _get_config_file_path()
-        
-        if not config_file.exists():
-            logger.error(f"Config file not found: {config_file}")
-            return False
-        
-        # Read current config file
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Use regex to find and remove the user ID
-        # Pattern matches: optional whitespace, user_id, optional comma, optional whitespace
-        pattern = rf'(\s*){re.escape(str(user_id))}(\s*,?\s*)'
-        
-        # Remove the user ID line
-        new_content = re.sub(pattern, '', content)
-        
-        # Clean up any double newlines that might have been created
-        new_content = re.sub(r'\n\n\n+', '\n\n', new_content)
-        
-        # Write back to file
-        with open(config_file, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        # Update runtime configuration
-        _reload_config()
-        
-        # Also update the runtime config object
-        if config and hasattr(config, 'AUTHORIZED_USER_IDS'):
-            if user_id in config.AUTHORIZED_USER_IDS:
-                config.AUTHORIZED_USER_IDS.remove(user_id)
-        
-        # Sync to project directory if running in Docker
-        _sync_to_project_directory(config_file)
-        
-        logger.info(f"User ID {user_id} removed from permanent whitelist")
+    # Nothing to do if the user is not whitelisted
+    if user_id not in _AUTH_IDS_SET:
+        logger.info(f"User ID {user_id} not in whitelist")
         return True
-        
-    except Exception as e:
-        logger.error(f"Error removing user {user_id} from permanent whitelist: {e}", exc_info=True)
-        return False
+    
+    return apply_whitelist_changes(remove_ids=[user_id])
 
 
 def add_username_to_permanent_whitelist(username: str) -> bool:
@@ -383,78 +704,14 @@ def add_username_to_permanent_whitelist(username: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        # Remove @ symbol if present
-        username = username.lstrip('@')
-        
-        if not username:
-            logger.error("Username cannot be empty")
-            return False
-        
-        config_file = _get_config_file_path()
-        
-        if not config_file.exists():
-            logger.error(f"Config file not found: {config_file}")
-            return False
-        
-        # Read current config file
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Check if username already exists (case-insensitive)
-        username_lower = username.lower()
-        pattern_check = rf'["\']([^"\']+)["\']'
-        existing_usernames = re.findall(pattern_check, content)
-        if any(u.lower() == username_lower for u in existing_usernames):
-            logger.info(f"Username {username} already in whitelist")
-            return True
-        
-        # Find the AUTHORIZED_USERNAMES section using regex
-        pattern = r'(AUTHORIZED_USERNAMES\s*=\s*\[)(.*?)(\])'
-        match = re.search(pattern, content, re.DOTALL)
-        
-        if not match:
-            logger.error("Could not find AUTHORIZED_USERNAMES section in config file")
-            return False
-        
-        # Get the list content
-        list_content = match.group(2)
-        
-        # Add the new username with proper string formatting
-        new_entry = f'    "{username}",'
-        
-        # Check if list is empty (only comments)
-        if not list_content.strip() or list_content.strip().startswith('#'):
-            # Empty list, add first entry
-            replacement = match.group(1) + '\n' + new_entry + '\n' + match.group(3)
-        else:
-            # Add after existing entries
-            replacement = match.group(1) + list_content + '\n' + new_entry + '\n' + match.group(3)
-        
-        # Replace in content
-        new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        # Write back to file
-        with open(config_file, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        # Update runtime configuration
-        _reload_config()
-        
-        # Also update the runtime config object
-        if config and hasattr(config, 'AUTHORIZED_USERNAMES'):
-            if username not in config.AUTHORIZED_USERNAMES:
-                config.AUTHORIZED_USERNAMES.append(username)
-        
-        # Sync to project directory if running in Docker
-        _sync_to_project_directory(config_file)
-        
-        logger.info(f"Username {username} added to permanent whitelist at {config_file}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error adding username {username} to permanent whitelist: {e}", exc_info=True)
+    # Remove @ symbol if present
+    username = username.lstrip('@')
+    
+    if not username:
+        logger.error("Username cannot be empty")
         return False
+    
+    return apply_whitelist_changes(add_usernames=[username])
 
 
 def remove_username_from_permanent_whitelist(username: str) -> bool:
@@ -467,60 +724,19 @@ def remove_username_from_permanent_whitelist(username: str) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        # Remove @ symbol if present
-        username = username.lstrip('@')
-        
-        if not username:
-            logger.error("Username cannot be empty")
-            return False
-        
-        config_file = _get_config_file_path()
-        
-        if not config_file.exists():
-            logger.error(f"Config file not found: {config_file}")
-            return False
-        
-        # Read current config file
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Use regex to find and remove the username (case-insensitive)
-        # Pattern matches: optional whitespace, quoted username, optional comma
-        # We need to match the exact username in quotes
-        pattern = rf'(\s*)["\']{re.escape(username)}["\'](\s*,?\s*)'
-        
-        # Remove the username line
-        new_content = re.sub(pattern, '', content, flags=re.IGNORECASE)
-        
-        # Clean up any double newlines that might have been created
-        new_content = re.sub(r'\n\n\n+', '\n\n', new_content)
-        
-        # Write back to file
-        with open(config_file, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        # Update runtime configuration
-        _reload_config()
-        
-        # Also update the runtime config object
-        if config and hasattr(config, 'AUTHORIZED_USERNAMES'):
-            # Remove case-insensitively
-            username_lower = username.lower()
-            config.AUTHORIZED_USERNAMES = [
-                u for u in config.AUTHORIZED_USERNAMES 
-                if u.lower() != username_lower
-            ]
-        
-        # Sync to project directory if running in Docker
-        _sync_to_project_directory(config_file)
-        
-        logger.info(f"Username {username} removed from permanent whitelist")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error removing username {username} from permanent whitelist: {e}", exc_info=True)
+    # Remove @ symbol if present
+    username = username.lstrip('@')
+    
+    if not username:
+        logger.error("Username cannot be empty")
         return False
+    
+    # Nothing to do if the username is not whitelisted
+    if username.lower() not in _AUTH_USERNAMES_SET:
+        logger.info(f"Username {username} not in whitelist")
+        return True
+    
+    return apply_whitelist_changes(remove_usernames=[username])
 
 
 def add_admin_to_permanent_config(user_id: int) -> bool:
@@ -533,129 +749,7 @@ def add_admin_to_permanent_config(user_id: int) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        config_file = _get_config_file_path()
-        
-        logger.info(f"Attempting to add admin {user_id} to config at: {config_file}")
-        logger.info(f"Config file absolute path: {config_file.absolute()}")
-        logger.info(f"Config file exists: {config_file.exists()}")
-        
-        if not config_file.exists():
-            logger.error(f"Config file not found: {config_file}")
-            return False
-        
-        # Check if we can write to the file
-        if not os.access(config_file, os.W_OK):
-            logger.error(f"Cannot write to config file: {config_file}")
-            try:
-                logger.error(f"File permissions: {oct(config_file.stat().st_mode)}")
-            except:
-                pass
-            return False
-        
-        # Read current config file
-        logger.info(f"Reading config file: {config_file}")
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # First, check if user ID already exists in ADMIN_USER_IDS section specifically
-        admin_pattern = r'ADMIN_USER_IDS\s*=\s*\[(.*?)\]'
-        admin_match = re.search(admin_pattern, content, re.DOTALL)
-        
-        if admin_match:
-            admin_content = admin_match.group(1)
-            # Check if user ID is already in the admin list
-            # Use word boundary to avoid partial matches
-            user_id_pattern = rf'\b{re.escape(str(user_id))}\b'
-            if re.search(user_id_pattern, admin_content):
-                logger.info(f"User ID {user_id} already in admin list")
-                return True
-        
-        # Find the ADMIN_USER_IDS section using regex
-        pattern = r'(ADMIN_USER_IDS\s*=\s*\[)(.*?)(\])'
-        match = re.search(pattern, content, re.DOTALL)
-        
-        if not match:
-            logger.error("Could not find ADMIN_USER_IDS section in config file")
-            return False
-        
-        # Get the list content
-        list_content = match.group(2)
-        
-        # Add the new admin ID
-        # Strip the list content to check if it's empty (ignoring whitespace and comments)
-        stripped_content = list_content.strip()
-        # Remove comments and empty lines for checking
-        non_comment_lines = [line for line in stripped_content.split('\n') 
-                           if line.strip() and not line.strip().startswith('#')]
-        
-        if non_comment_lines:
-            # List has entries, add new entry after the last one
-            # Ensure the last existing entry has a comma
-            lines = list_content.rstrip().split('\n')
-            # Find the last non-empty, non-comment line
-            last_line_idx = -1
-            for i in range(len(lines) - 1, -1, -1):
-                line = lines[i].strip()
-                if line and not line.startswith('#'):
-                    last_line_idx = i
-                    break
-            
-            if last_line_idx >= 0:
-                # Ensure the last line has a comma
-                last_line = lines[last_line_idx]
-                if not last_line.rstrip().endswith(','):
-                    # Add comma to the last line if it doesn't have one
-                    lines[last_line_idx] = last_line.rstrip() + ','
-            
-            # Reconstruct list_content with proper formatting
-            formatted_content = '\n'.join(lines)
-            if not formatted_content.endswith('\n'):
-                formatted_content += '\n'
-            
-            # Add the new entry
-            new_entry = f"    {user_id},"
-            replacement = match.group(1) + formatted_content + new_entry + '\n' + match.group(3)
-        else:
-            # Empty list, add first entry
-            new_entry = f"    {user_id},"
-            replacement = match.group(1) + '\n' + new_entry + '\n' + match.group(3)
-        
-        # Replace in content
-        new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-        
-        # Write back to file
-        logger.info(f"Writing updated config to: {config_file}")
-        try:
-            with open(config_file, 'w', encoding='utf-8') as f:
-                f.write(new_content)
-            logger.info(f"Successfully wrote to config file: {config_file}")
-        except Exception as write_error:
-            logger.error(f"Failed to write to config file: {write_error}", exc_info=True)
-            return False
-        
-        # Verify the write was successful
-        if not config_file.exists():
-            logger.error(f"Config file disappeared after write: {config_file}")
-            return False
-        
-        # Update runtime configuration
-        _reload_config()
-        
-        # Also update the runtime config object
-        if config and hasattr(config, 'ADMIN_USER_IDS'):
-            if user_id not in config.ADMIN_USER_IDS:
-                config.ADMIN_USER_IDS.append(user_id)
-        
-        # Sync to project directory if running in Docker
-        _sync_to_project_directory(config_file)
-        
-        logger.info(f"User ID {user_id} successfully added to admin list at {config_file}")
-        return True
-        
-    except Exception as e:
-        logger.error(f"Error adding admin {user_id}: {e}", exc_info=True)
-        return False
+    return apply_whitelist_changes(add_admin_ids=[user_id])
 
 
 def remove_admin_from_permanent_config(user_id: int) -> bool:
@@ -668,61 +762,49 @@ def remove_admin_from_permanent_config(user_id: int) -> bool:
     Returns:
         True if successful, False otherwise
     """
-    try:
-        config_file = _get_config_file_path()
-        
-        if not config_file.exists():
-            logger.error(f"Config file not found: {config_file}")
-            return False
-        
-        # Read current config file
-        with open(config_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Use regex to find and remove the admin ID from ADMIN_USER_IDS section only
-        # First, find the ADMIN_USER_IDS section
-        admin_pattern = r'(ADMIN_USER_IDS\s*=\s*\[)(.*?)(\])'
-        admin_match = re.search(admin_pattern, content, re.DOTALL)
-        
-        if not admin_match:
-            logger.error("Could not find ADMIN_USER_IDS section in config file")
-            return False
-        
-        # Check if user ID is in admin list
-        admin_content = admin_match.group(2)
-        if str(user_id) not in admin_content:
-            logger.info(f"User ID {user_id} not in admin list")
-            return True
-        
-        # Remove the user ID from admin section
-        user_id_pattern = rf'(\s*){re.escape(str(user_id))}(\s*,?\s*)'
-        new_admin_content = re.sub(user_id_pattern, '', admin_content)
-        
-        # Reconstruct the section
-        replacement = admin_match.group(1) + new_admin_content + admin_match.group(3)
-        new_content = re.sub(admin_pattern, replacement, content, flags=re.DOTALL)
-        
-        # Clean up any double newlines
-        new_content = re.sub(r'\n\n\n+', '\n\n', new_content)
-        
-        # Write back to file
-        with open(config_file, 'w', encoding='utf-8') as f:
-            f.write(new_content)
-        
-        # Update runtime configuration
-        _reload_config()
-        
-        # Also update the runtime config object
-        if config and hasattr(config, 'ADMIN_USER_IDS'):
-            if user_id in config.ADMIN_USER_IDS:
-                config.ADMIN_USER_IDS.remove(user_id)
-        
-        # Sync to project directory if running in Docker
-        _sync_to_project_directory(config_file)
-        
-        logger.info(f"User ID {user_id} removed from admin list")
+    # Nothing to do if the user is not an admin
+    if user_id not in _ADMIN_IDS_SET:
+        logger.info(f"User ID {user_id} not in admin list")
         return True
-        
-    except Exception as e:
-        logger.error(f"Error removing admin {user_id}: {e}", exc_info=True)
-        return False
+    
+    return apply_whitelist_changes(remove_admin_ids=[user_id])
+
+
+# Async wrappers for use from Telegram handlers
+# The config edits do blocking file I/O and a module re-import, so run them
+# in a worker thread to keep the event loop responsive
+
+
+async def apply_whitelist_changes_async(**changes) -> bool:
+    """Async version of apply_whitelist_changes"""
+    return await asyncio.to_thread(apply_whitelist_changes, **changes)
+
+
+async def add_user_to_permanent_whitelist_async(user_id: int) -> bool:
+    """Async version of add_user_to_permanent_whitelist"""
+    return await asyncio.to_thread(add_user_to_permanent_whitelist, user_id)
+
+
+async def remove_user_from_permanent_whitelist_async(user_id: int) -> bool:
+    """Async version of remove_user_from_permanent_whitelist"""
+    return await asyncio.to_thread(remove_user_from_permanent_whitelist, user_id)
+
+
+async def add_username_to_permanent_whitelist_async(username: str) -> bool:
+    """Async version of add_username_to_permanent_whitelist"""
+    return await asyncio.to_thread(add_username_to_permanent_whitelist, username)
+
+
+async def remove_username_from_permanent_whitelist_async(username: str) -> bool:
+    """Async version of remove_username_from_permanent_whitelist"""
+    return await asyncio.to_thread(remove_username_from_permanent_whitelist, username)
+
+
+async def add_admin_to_permanent_config_async(user_id: int) -> bool:
+    """Async version of add_admin_to_permanent_config"""
+    return await asyncio.to_thread(add_admin_to_permanent_config, user_id)
+
+
+async def remove_admin_from_permanent_config_async(user_id: int) -> bool:
+    """Async version of remove_admin_from_permanent_config"""
+    return await asyncio.to_thread(remove_admin_from_permanent_config, user_id)
@@ -22,8 +22,12 @@ import logging
 import signal
 import sys
 import os
+import shutil
+import time
 from contextlib import asynccontextmanager
-from typing import Dict, Any, Optional
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
 
 # Ensure the app module can be found
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -36,8 +40,9 @@ if os.path.exists(app_dir) and app_dir not in sys.path:
     sys.path.insert(0, app_dir)
 
 # Telegram Bot Framework
-from telegram import Update, Message, Audio, Voice, VideoNote, Document
+from telegram import Update, Message, MessageEntity, Audio, Voice, VideoNote, Document
 from telegram.ext import (
+    AIORateLimiter,
     Application, 
     CommandHandler, 
     MessageHandler, 
@@ -45,6 +50,8 @@ from telegram.ext import (
     ContextTypes
 )
 from telegram.error import NetworkError, TimedOut, RetryAfter
+from cachetools import LRUCache, TTLCache
+import httpx
 
 # Application Components
 from app.config import settings
@@ -55,7 +62,7 @@ from app.services.elevenlabs_client import ElevenLabsClient
 from app.services.openai_client import OpenAIClient
 
 # Whitelist system
-from app.whitelist import check_user_access, check_username_access
+from app.whitelist import is_authorized
 from app.bot_handlers import (
     admin_add_user_command,
     admin_remove_user_command,
@@ -70,6 +77,146 @@ from app.bot_handlers import (
 setup_logging()
 logger = get_logger(__name__)
 
+# Admin whitelist commands use underscore format: /adduser_123456, /removeuser_123456, etc.
+# Keyed by the command stem before the first underscore; built once at import
+_ADMIN_COMMANDS = {
+    "/adduser": admin_add_user_command,
+    "/removeuser": admin_remove_user_command,
+    "/addusername": admin_add_username_command,
+    "/removeusername": admin_remove_username_command,
+    "/addadmin": admin_add_admin_command,
+    "/removeadmin": admin_remove_admin_command,
+}
+
+# All supported audio content, matched by a single handler
+_AUDIO_FILTER = filters.AUDIO | filters.VOICE | filters.VIDEO_NOTE | filters.Document.AUDIO
+
+# Everything that is neither a command nor supported audio
+_UNSUPPORTED_FILTER = ~(filters.COMMAND | _AUDIO_FILTER)
+
+# Message attribute -> label for unsupported content, checked in order
+_UNSUPPORTED_TYPES = (
+    ("photo", "photo"),
+    ("video", "video"),
+    ("document", "document"),
+    ("text", "text message"),
+)
+
+# ===========================================
+# RESPONSE TEMPLATES
+# ===========================================
+# Built once at import time; dynamic parts are filled in with str.format
+
+def _static_reply(markup: str) -> Tuple[str, Tuple[MessageEntity, ...]]:
+    """
+    Convert a static **bold** template into plain text plus bold entities
+    
+    Static replies are sent with entities= instead of parse_mode, so neither
+    the library nor Telegram has to parse Markdown on every send.
+    
+    Args:
+        markup: Template text using **...** for bold spans
+        
+    Returns:
+        Tuple of (plain text, bold MessageEntity objects)
+    """
+    text_parts = []
+    entities = []
+    offset = 0  # Telegram entity offsets count UTF-16 code units
+    
+    for index, part in enumerate(markup.split("**")):
+        length = len(part.encode("utf-16-le")) // 2
+        if index % 2 and length:
+            entities.append(MessageEntity(MessageEntity.BOLD, offset, length))
+        text_parts.append(part)
+        offset += length
+    
+    return "".join(text_parts), tuple(entities)
+
+_ACCESS_DENIED_MSG = (
+    "❌ **Доступ запрещен**\n\n"
+    "Вы не авторизованы для использования этого бота.\n"
+    "Обратитесь к администратору для получения доступа."
+)
+_ACCESS_DENIED_TEXT, _ACCESS_DENIED_ENTITIES = _static_reply(_ACCESS_DENIED_MSG)
+
+_WELCOME_TMPL = "🎤 **Welcome to Audio Bot, {first_name}**\n\n"
+
+_HELP_MSG = (
+    "🤖 **Audio Bot Help**\n\n"
+    "**Commands:**\n"
+    "• `/start` - Start the bot and see welcome message\n"
+    "• `/help` - Show this help message\n"
+)
+
+_PROCESSING_MSG_TMPL = (
+    "🔄 **Processing your {audio_type}...**\n\n"
+    "⏳ This usually takes 10-30 seconds\n"
+    "📝 Transcribing speech and checking grammar..."
+)
+
+_TRANSCRIBED_MSG_TMPL = (
+    "🔄 **Processing your {audio_type}...**\n\n"
+    "✅ Speech transcribed\n"
+    "📝 Checking grammar..."
+)
+
+_PROCESSING_FAILED_TMPL = (
+    "❌ **Failed to process {audio_type}**\n\n"
+    "**Error:** {error}\n\n"
+    "💡 **Suggestions:**\n"
+    "• Check if the audio is clear and not corrupted\n"
+    "• Try with a smaller file (under 25MB)\n"
+    "• Ensure the audio contains speech\n"
+    "• Try again in a few moments\n\n"
+    "If the problem persists, try to connect the developer"
+)
+
+_UNEXPECTED_ERROR_TMPL = (
+    "💥 **Unexpected error processing {audio_type}**\n\n"
+    "Sorry, something went wrong on our end.\n"
+    "Our team has been notified.\n\n"
+    "Please try again later."
+)
+# Formatted once per audio label as (plain text, bold entities)
+_UNEXPECTED_ERROR_REPLIES = {
+    label: _static_reply(_UNEXPECTED_ERROR_TMPL.format(audio_type=label))
+    for label in ("voice message", "audio file", "video note", "audio document")
+}
+
+_UNSUPPORTED_TMPL = (
+    "🚫 **Unsupported {message_type}**\n\n"
+    "I can only process audio content:\n"
+    "• 🎤 Voice messages\n"
+    "• 🎵 Audio files (MP3, WAV, etc.)\n"
+    "• 🎬 Video notes\n"
+    "• 📎 Audio documents\n\n"
+    "Please send an audio file or use /help for more information."
+)
+# Formatted once per label as (plain text, bold entities)
+_UNSUPPORTED_REPLIES = {
+    label: _static_reply(_UNSUPPORTED_TMPL.format(message_type=label))
+    for label in [label for _, label in _UNSUPPORTED_TYPES] + ["message"]
+}
+
+_ERROR_HANDLER_MSG = (
+    "💥 **Oops! Something went wrong.**\n\n"
+    "Our team has been notified and we're looking into it.\n"
+    "Please try again in a few moments.\n\n"
+    "If the problem persists, use /help for support information."
+)
+_ERROR_HANDLER_TEXT, _ERROR_HANDLER_ENTITIES = _static_reply(_ERROR_HANDLER_MSG)
+
+@dataclass(slots=True)
+class UserSession:
+    """Per-user activity tracked between messages"""
+    first_name: str
+    username: Optional[str]
+    start_time: float
+    messages_processed: int = 0
+    last_activity: float = 0.0
+
+
 class TelegramAudioBot:
     """
     Main Telegram Bot class that orchestrates all audio processing functionality
@@ -79,10 +226,20 @@ class TelegramAudioBot:
         """Initialize the bot with all required services"""
         self.audio_processor = None
         self.application = None
+        self._http: Optional[httpx.AsyncClient] = None
         self.is_running = False
         
         # User session tracking
-        self.user_sessions: Dict[int, Dict[str, Any]] = {}
+        # Bounded (least recently used dropped first) and swept for idle users
+        # by _evict_idle_sessions, so inactive users don't accumulate forever
+        self.user_sessions: "LRUCache[int, UserSession]" = LRUCache(maxsize=settings.max_sessions)
+        self._eviction_task: Optional[asyncio.Task] = None
+        
+        # Successful results keyed by Telegram file_unique_id, so forwarded or
+        # re-sent clips skip transcription and grammar checking entirely
+        self.result_cache: TTLCache = TTLCache(maxsize=1024, ttl=24 * 3600)
+        self.result_cache_hits = 0
+        self.result_cache_misses = 0
         
         logger.info("🤖 Telegram Audio Bot initializing...")
     
@@ -91,8 +248,15 @@ class TelegramAudioBot:
         try:
             logger.info("🔧 Initializing backend services...")
             
+            # Shared connection pool for outgoing API calls, so requests reuse
+            # kept-alive connections instead of a new TCP/TLS handshake each time
+            self._http = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                timeout=30.0
+            )
+            
             # Initialize audio processor (which includes ElevenLabs and OpenAI clients)
-            self.audio_processor = AudioProcessor()
+            self.audio_processor = AudioProcessor(http_client=self._http)
             
             # Test service connectivity
             await self._test_service_health()
@@ -100,81 +264,68 @@ class TelegramAudioBot:
             logger.info("✅ All backend services initialized successfully")
             
         except Exception as e:
-            logger.error(f"❌ Failed to initialize services: {e}")
+            logger.error("❌ Failed to initialize services: %s", e)
+            # stop_bot() never runs for a bot that did not start, so release
+            # the connection pool here
+            if self._http:
+                await self._http.aclose()
+                self._http = None
             raise
     
     async def _test_service_health(self):
         """Test connectivity to all external services"""
         logger.info("🏥 Testing service health...")
         
-        # Test ElevenLabs
-        try:
-            health = await self.audio_processor.elevenlabs_client.check_api_health()
-            if health.get("healthy"):
-                logger.info("✅ ElevenLabs API: Healthy")
-            else:
-                logger.warning(f"⚠️ ElevenLabs API: {health.get('error', 'Unknown issue')}")
-        except Exception as e:
-            logger.warning(f"⚠️ ElevenLabs health check failed: {e}")
+        # Run both checks concurrently so their network round-trips overlap
+        results = await asyncio.gather(
+            self.audio_processor.elevenlabs_client.check_api_health(),
+            self.audio_processor.openai_client.check_api_health(),
+            return_exceptions=True
+        )
         
-        # Test OpenAI
-        try:
-            health = await self.audio_processor.openai_client.check_api_health()
-            if health.get("healthy"):
-                logger.info("✅ OpenAI API: Healthy")
+        for service, health in zip(("ElevenLabs", "OpenAI"), results):
+            if isinstance(health, Exception):
+                logger.warning("⚠️ %s health check failed: %s", service, health)
+            elif health.get("healthy"):
+                logger.info("✅ %s API: Healthy", service)
             else:
-                logger.warning(f"⚠️ OpenAI API: {health.get('error', 'Unknown issue')}")
-        except Exception as e:
-            logger.warning(f"⚠️ OpenAI health check failed: {e}")
+                logger.warning("⚠️ %s API: %s", service, health.get('error', 'Unknown issue'))
     
     def create_application(self) -> Application:
         """Create and configure the Telegram application"""
         logger.info("📱 Creating Telegram application...")
         
         # Create application with token
-        application = Application.builder().token(settings.telegram_bot_token).build()
+        # AIORateLimiter paces outgoing requests under Telegram's flood limits
+        # (~30 msg/s overall, 20 msg/min per group) instead of reacting to RetryAfter
+        application = (
+            Application.builder()
+            .token(settings.telegram_bot_token)
+            .rate_limiter(AIORateLimiter(
+                overall_max_rate=30,
+                overall_time_period=1,
+                group_max_rate=20,
+                group_time_period=60,
+                max_retries=3,
+            ))
+            .build()
+        )
         
         # Add command handlers
         application.add_handler(CommandHandler("start", self.start_command))
         application.add_handler(CommandHandler("help", self.help_command))
+        application.add_handler(CommandHandler("whitelist", admin_whitelist_status_command))
         
         # Add admin whitelist command handlers
-        # These commands use underscore format: /adduser_123456, /removeuser_123456, etc.
-        application.add_handler(MessageHandler(
-            filters.Regex(r'^/adduser_\d+') & filters.COMMAND, 
-            admin_add_user_command
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex(r'^/removeuser_\d+') & filters.COMMAND, 
-            admin_remove_user_command
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex(r'^/addusername_[\w@]+') & filters.COMMAND, 
-            admin_add_username_command
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex(r'^/removeusername_[\w@]+') & filters.COMMAND, 
-            admin_remove_username_command
-        ))
-        # Admin management commands
-        application.add_handler(MessageHandler(
-            filters.Regex(r'^/addadmin_\d+') & filters.COMMAND, 
-            admin_add_admin_command
-        ))
-        application.add_handler(MessageHandler(
-            filters.Regex(r'^/removeadmin_\d+') & filters.COMMAND, 
-            admin_remove_admin_command
-        ))
-        application.add_handler(CommandHandler("whitelist", admin_whitelist_status_command))
+        # One handler dispatches /adduser_123456, /removeuser_123456, etc. by prefix,
+        # so regular commands aren't run through a regex per admin command
+        application.add_handler(MessageHandler(filters.COMMAND, self._admin_dispatch))
         
-        # Add message handlers for different audio types
-        application.add_handler(MessageHandler(filters.AUDIO, self.handle_audio_message))
-        application.add_handler(MessageHandler(filters.VOICE, self.handle_voice_message))
-        application.add_handler(MessageHandler(filters.VIDEO_NOTE, self.handle_video_note))
-        application.add_handler(MessageHandler(filters.Document.AUDIO, self.handle_audio_document))
+        # Add one message handler for all audio types
+        application.add_handler(MessageHandler(_AUDIO_FILTER, self.handle_any_audio))
         
         # Add handler for unsupported message types
-        application.add_handler(MessageHandler(~filters.COMMAND, self.handle_unsupported_message))
+        application.add_handler(MessageHandler(_UNSUPPORTED_FILTER, self.handle_unsupported_message))
         
         # Add error handler
         application.add_error_handler(self.error_handler)
@@ -186,39 +337,59 @@ class TelegramAudioBot:
     # COMMAND HANDLERS
     # ===========================================
     
+    async def _deny(self, message: Message, user, attempt: str = ""):
+        """Log an access denial and send the access-denied reply"""
+        if attempt:
+            logger.warning("Access denied for user %s (%s) attempting to %s", user.id, user.username, attempt)
+        else:
+            logger.warning("Access denied for user %s (%s)", user.id, user.username)
+        await message.reply_text(_ACCESS_DENIED_TEXT, entities=_ACCESS_DENIED_ENTITIES)
+    
+    async def _reply_or_edit(
+        self,
+        processing_msg: Optional[Message],
+        message: Message,
+        text: str,
+        entities: Tuple[MessageEntity, ...]
+    ):
+        """
+        Show text in place of the processing message, or as a new reply
+        
+        Falls back to replying to the original message when the processing
+        message was never sent or can no longer be edited.
+        """
+        if processing_msg is not None:
+            try:
+                await processing_msg.edit_text(text, entities=entities)
+                return
+            except Exception as e:
+                logger.debug("Could not edit processing message: %s", e)
+        
+        await message.reply_text(text, entities=entities)
+    
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
         chat_id = update.effective_chat.id
         
-        # Check user access
-        if not check_user_access(user.id):
-            # Also check username access if user ID check fails
-            username = user.username if user.username else ""
-            if not check_username_access(username):
-                logger.warning(f"Access denied for user {user.id} ({user.username})")
-                await update.message.reply_text(
-                    "❌ **Доступ запрещен**\n\n"
-                    "Вы не авторизованы для использования этого бота.\n"
-                    "Обратитесь к администратору для получения доступа."
-                )
-                return
+        # Check user access (user ID or username)
+        if not is_authorized(user):
+            await self._deny(update.message, user)
+            return
         
-        logger.info(f"👋 New user started bot: {user.first_name} ({user.id})")
+        logger.info("👋 New user started bot: %s (%s)", user.first_name, user.id)
         
         # Initialize user session
-        self.user_sessions[user.id] = {
-            "first_name": user.first_name,
-            "username": user.username,
-            "start_time": asyncio.get_event_loop().time(),
-            "messages_processed": 0,
-            "last_activity": asyncio.get_event_loop().time()
-        }
-        
-        welcome_message = (
-            f"🎤 **Welcome to Audio Bot, {user.first_name}**\n\n"
+        now = time.monotonic()
+        self.user_sessions[user.id] = UserSession(
+            first_name=user.first_name,
+            username=user.username,
+            start_time=now,
+            last_activity=now
         )
         
+        welcome_message = _WELCOME_TMPL.format(first_name=user.first_name)
+        
         await update.message.reply_text(welcome_message, parse_mode="Markdown")
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -230,202 +401,186 @@ class TelegramAudioBot:
         
         user = update.effective_user
         
-        # Check user access
-        if not check_user_access(user.id):
-            # Also check username access if user ID check fails
-            username = user.username if user.username else ""
-            if not check_username_access(username):
-                logger.warning(f"Access denied for user {user.id} ({user.username}) attempting to use /help")
-                await message.reply_text(
-                    "❌ **Доступ запрещен**\n\n"
-                    "Вы не авторизованы для использования этого бота.\n"
-                    "Обратитесь к администратору для получения доступа."
-                )
-                return
-            
-        help_text = (
-            "🤖 **Audio Bot Help**\n\n"
-            "**Commands:**\n"
-            "• `/start` - Start the bot and see welcome message\n"
-            "• `/help` - Show this help message\n"
-        )
+        # Check user access (user ID or username)
+        if not is_authorized(user):
+            await self._deny(message, user, "use /help")
+            return
         
-        await message.reply_text(help_text, parse_mode="Markdown")
+        await message.reply_text(_HELP_MSG, parse_mode="Markdown")
     
     
+    async def _admin_dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route underscore-style admin commands to their handler by command stem"""
+        if not update.message or not update.message.text:
+            return
+        
+        stem, sep, _ = update.message.text.partition("_")
+        handler = _ADMIN_COMMANDS.get(stem) if sep else None
+        if handler:
+            await handler(update, context)
+    
     # ===========================================
     # AUDIO MESSAGE HANDLERS
     # ===========================================
     
-    async def handle_audio_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle regular audio file messages"""
-        await self._process_audio_message(update, "audio file")
-    
-    async def handle_voice_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle voice messages"""
-        await self._process_audio_message(update, "voice message")
-    
-    async def handle_video_note(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle video notes (round video messages)"""
-        await self._process_audio_message(update, "video note")
-    
-    async def handle_audio_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle audio files sent as documents"""
-        await self._process_audio_message(update, "audio document")
+    async def handle_any_audio(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle voice messages, audio files, video notes and audio documents"""
+        message = update.message
+        if message.voice:
+            audio_type = "voice message"
+        elif message.audio:
+            audio_type = "audio file"
+        elif message.video_note:
+            audio_type = "video note"
+        else:
+            audio_type = "audio document"
+        
+        await self._process_audio_message(update, audio_type)
     
     async def _process_audio_message(self, update: Update, audio_type: str):
         """Common audio processing logic for all audio message types"""
         user = update.effective_user
         message = update.message
         
-        # Check user access
-        if not check_user_access(user.id):
-            # Also check username access if user ID check fails
-            username = user.username if user.username else ""
-            if not check_username_access(username):
-                logger.warning(f"Access denied for user {user.id} ({user.username}) attempting to process {audio_type}")
-                await message.reply_text(
-                    "❌ **Доступ запрещен**\n\n"
-                    "Вы не авторизованы для использования этого бота.\n"
-                    "Обратитесь к администратору для получения доступа."
-                )
-                return
+        # Check user access (user ID or username)
+        if not is_authorized(user):
+            await self._deny(message, user, f"process {audio_type}")
+            return
         
-        logger.info(f"🎵 Processing {audio_type} from user {user.first_name} ({user.id})")
+        logger.info("🎵 Processing %s from user %s (%s)", audio_type, user.first_name, user.id)
         
         # Update user session
-        if user.id in self.user_sessions:
-            self.user_sessions[user.id]["last_activity"] = asyncio.get_event_loop().time()
-            self.user_sessions[user.id]["messages_processed"] += 1
-        
-        # Send initial processing message
-        processing_msg = await message.reply_text(
-            f"🔄 **Processing your {audio_type}...**\n\n"
-            "⏳ This usually takes 10-30 seconds\n"
-            "📝 Transcribing speech and checking grammar...",
+        session = self.user_sessions.get(user.id)
+        if session is not None:
+            session.last_activity = time.monotonic()
+            session.messages_processed += 1
+        
+        # Serve identical audio from the result cache
+        cache_key = getattr(message.effective_attachment, "file_unique_id", None)
+        cached = self.result_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            self.result_cache_hits += 1
+            logger.info(
+                "♻️ Result cache hit for %s from user %s (hits=%d, misses=%d)",
+                audio_type, user.id, self.result_cache_hits, self.result_cache_misses
+            )
+            await message.reply_text(
+                self._format_success_response(cached, audio_type),
+                parse_mode="Markdown"
+            )
+            return
+        self.result_cache_misses += 1
+        
+        # Send initial processing message and start processing the audio at the
+        # same time, so the Telegram round-trip overlaps with the pipeline
+        processing_task = asyncio.create_task(message.reply_text(
+            _PROCESSING_MSG_TMPL.format(audio_type=audio_type),
             parse_mode="Markdown"
-        )
+        ))
+        stages = self.audio_processor.process_audio_stages(message)
+        progress_task = None
+        processing_msg = None
         
         try:
-            # Process the audio using the audio processor service
-            result = await self.audio_processor.process_audio_message(message)
+            result = {"success": False, "error": "Processing did not complete"}
+            async for event in stages:
+                if event["stage"] == "transcription_done":
+                    # Tell the user transcription is done while grammar runs
+                    processing_msg = await processing_task
+                    progress_task = asyncio.create_task(processing_msg.edit_text(
+                        _TRANSCRIBED_MSG_TMPL.format(audio_type=audio_type),
+                        parse_mode="Markdown"
+                    ))
+                elif "result" in event:
+                    result = event["result"]
+            
+            processing_msg = await processing_task
+            if progress_task:
+                # The final edit must land after the progress edit
+                await asyncio.gather(progress_task, return_exceptions=True)
             
             if result.get("success"):
+                if cache_key:
+                    self.result_cache[cache_key] = result
+                
                 # Format successful response
                 response_text = self._format_success_response(result, audio_type)
                 
                 # Edit the processing message with results
                 await processing_msg.edit_text(response_text, parse_mode="Markdown")
                 
-                logger.info(f"✅ Successfully processed {audio_type} for user {user.id}")
+                logger.info("✅ Successfully processed %s for user %s", audio_type, user.id)
                 
             else:
                 # Handle processing error
                 error_msg = result.get("error", "Unknown error occurred")
-                response_text = (
-                    f"❌ **Failed to process {audio_type}**\n\n"
-                    f"**Error:** {error_msg}\n\n"
-                    "💡 **Suggestions:**\n"
-                    "• Check if the audio is clear and not corrupted\n"
-                    "• Try with a smaller file (under 25MB)\n"
-                    "• Ensure the audio contains speech\n"
-                    "• Try again in a few moments\n\n"
-                    "If the problem persists, try to connect the developer"
-                )
+                response_text = _PROCESSING_FAILED_TMPL.format(audio_type=audio_type, error=error_msg)
                 
                 await processing_msg.edit_text(response_text, parse_mode="Markdown")
                 
-                logger.warning(f"❌ Failed to process {audio_type} for user {user.id}: {error_msg}")
+                logger.warning("❌ Failed to process %s for user %s: %s", audio_type, user.id, error_msg)
                 
         except Exception as e:
+            # Stop the pipeline and the progress edit, but let the "Processing…"
+            # reply land so the error can replace it instead of orphaning it
+            if progress_task:
+                progress_task.cancel()
+                await asyncio.gather(progress_task, return_exceptions=True)
+            await stages.aclose()
+            sent, = await asyncio.gather(processing_task, return_exceptions=True)
+            if not isinstance(sent, BaseException):
+                processing_msg = sent
+            
             # Handle unexpected errors
-            logger.error(f"❌ Unexpected error processing {audio_type}: {e}", exc_info=True)
+            logger.error("❌ Unexpected error processing %s: %s", audio_type, e, exc_info=True)
             
-            error_response = (
-                f"💥 **Unexpected error processing {audio_type}**\n\n"
-                "Sorry, something went wrong on our end.\n"
-                "Our team has been notified.\n\n"
-                "Please try again later."
+            text, entities = _UNEXPECTED_ERROR_REPLIES.get(audio_type) or _static_reply(
+                _UNEXPECTED_ERROR_TMPL.format(audio_type=audio_type)
             )
-            
-            try:
-                await processing_msg.edit_text(error_response, parse_mode="Markdown")
-            except:
-                # If editing fails, send a new message
-                await message.reply_text(error_response, parse_mode="Markdown")
+            await self._reply_or_edit(processing_msg, message, text, entities)
     
     def _format_success_response(self, result: Dict[str, Any], audio_type: str) -> str:
         """Format a successful processing result into a user-friendly message"""
-        original_text = result.get("original_text", "")
-        corrected_text = result.get("corrected_text", "")
-        language = result.get("language", "unknown")
-        processing_time = result.get("processing_time", 0)
-        confidence = result.get("transcription_confidence", 0)
-        
-        # Determine if grammar was actually corrected
-        grammar_corrected = original_text.strip() != corrected_text.strip()
-        
-        response = f"✅ **{audio_type.title()} processed successfully!**\n\n"
+        # Collect the pieces and join once instead of repeated string +=
+        parts = [f"✅ **{audio_type.title()} processed successfully!**\n\n\n"]
         
         # Enhanced grammar analysis and speaking tips
         grammar_issues = result.get("grammar_issues", [])
         speaking_tips = result.get("speaking_tips", [])
-        confidence_score = result.get("confidence_score", 0)
-        improvements_made = result.get("improvements_made", 0)
-        method_used = result.get("method_used", "unknown")
         
-        response += "\n"
-        
-        if grammar_issues and isinstance(grammar_issues, list) and len(grammar_issues) > 0:
+        if grammar_issues and isinstance(grammar_issues, list):
             # Filter out placeholder messages
             real_issues = [issue for issue in grammar_issues if issue and "Unable to analyze" not in issue]
             if real_issues:
-                response += f"🔍 **Grammar Analysis:**\n"
-                for i, issue in enumerate(real_issues[:5], 1):  # Limit to 3 issues
-                    response += f"• {issue}\n"
-                response += "\n"
+                parts.append("🔍 **Grammar Analysis:**\n")
+                parts.extend(f"• {issue}\n" for issue in real_issues[:5])  # Limit to 5 issues
+                parts.append("\n")
         
-        if speaking_tips and isinstance(speaking_tips, list) and len(speaking_tips) > 0:
+        if speaking_tips and isinstance(speaking_tips, list):
             # Filter out placeholder messages
             real_tips = [tip for tip in speaking_tips if tip and "Try speaking more clearly" not in tip]
             if real_tips:
-                response += f"💡 **Speaking Improvement Tips:**\n"
-                for i, tip in enumerate(real_tips[:5], 1):  # Limit to 3 tips
-                    # Truncate long tips to keep response manageable
-                    response += f"• {tip}\n"
-                response += "\n"
+                parts.append("💡 **Speaking Improvement Tips:**\n")
+                parts.extend(f"• {tip}\n" for tip in real_tips[:5])  # Limit to 5 tips
+                parts.append("\n")
         
         # Optional: Audio events
         if result.get("audio_events"):
-            events = len(result["audio_events"])
-            response += f"• Audio Events: {events}\n"
+            parts.append(f"• Audio Events: {len(result['audio_events'])}\n")
         
-        return response
+        return "".join(parts)
     
     async def handle_unsupported_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle unsupported message types"""
-        message_type = "message"
-        
-        if update.message.photo:
-            message_type = "photo"
-        elif update.message.video:
-            message_type = "video"
-        elif update.message.document:
-            message_type = "document"
-        elif update.message.text:
-            message_type = "text message"
-        
-        response = (
-            f"🚫 **Unsupported {message_type}**\n\n"
-            "I can only process audio content:\n"
-            "• 🎤 Voice messages\n"
-            "• 🎵 Audio files (MP3, WAV, etc.)\n"
-            "• 🎬 Video notes\n"
-            "• 📎 Audio documents\n\n"
-            "Please send an audio file or use /help for more information."
+        message = update.message
+        message_type = next(
+            (label for attr, label in _UNSUPPORTED_TYPES if getattr(message, attr)),
+            "message"
         )
         
-        await update.message.reply_text(response, parse_mode="Markdown")
+        text, entities = _UNSUPPORTED_REPLIES[message_type]
+        
+        await message.reply_text(text, entities=entities)
     
     # ===========================================
     # ERROR HANDLING
@@ -440,7 +595,7 @@ class TelegramAudioBot:
             # Network errors are common and the library will retry automatically
             # Log at warning level instead of error to reduce noise
             logger.warning(
-                f"⚠️ Network error (will retry automatically): {type(error).__name__}: {error}"
+                "⚠️ Network error (will retry automatically): %s: %s", type(error).__name__, error
             )
             # Don't notify users about network errors - they're not user-facing issues
             return
@@ -448,20 +603,21 @@ class TelegramAudioBot:
         # Handle timeout errors similarly
         if isinstance(error, TimedOut):
             logger.warning(
-                f"⏱️ Request timeout (will retry automatically): {error}"
+                "⏱️ Request timeout (will retry automatically): %s", error
             )
             return
         
-        # Handle rate limiting - log but don't notify user
+        # Handle rate limiting - the rate limiter already retried, so this only
+        # fires once its retries are exhausted; log but don't notify user
         if isinstance(error, RetryAfter):
             logger.warning(
-                f"⏳ Rate limited by Telegram API. Retry after {error.retry_after} seconds"
+                "⏳ Rate limited by Telegram API. Retry after %s seconds", error.retry_after
             )
             return
         
         # For other errors, log as error and notify user if possible
         logger.error(
-            f"❌ Exception while handling update {update}: {error}", 
+            "❌ Exception while handling update %s: %s", update, error,
             exc_info=error
         )
         
@@ -470,16 +626,11 @@ class TelegramAudioBot:
             try:
                 await context.bot.send_message(
                     chat_id=update.effective_chat.id,
-                    text=(
-                        "💥 **Oops! Something went wrong.**\n\n"
-                        "Our team has been notified and we're looking into it.\n"
-                        "Please try again in a few moments.\n\n"
-                        "If the problem persists, use /help for support information."
-                    ),
-                    parse_mode="Markdown"
+                    text=_ERROR_HANDLER_TEXT,
+                    entities=_ERROR_HANDLER_ENTITIES
                 )
             except Exception as e:
-                logger.error(f"Failed to send error message to user: {e}")
+                logger.error("Failed to send error message to user: %s", e)
     
     # ===========================================
     # BOT LIFECYCLE MANAGEMENT
@@ -487,6 +638,15 @@ class TelegramAudioBot:
     
     async def start_bot(self):
         """Start the Telegram bot"""
+        global stop_event
+        stop_event = asyncio.Event()
+        
+        # Deliver SIGINT/SIGTERM inside the event loop for graceful shutdown.
+        # Installed before startup, so a signal during slow initialization
+        # still ends in stop_bot() once the bot is up
+        loop = asyncio.get_running_loop()
+        self._set_stop_signal_handlers(loop, install=True)
+        
         try:
             logger.info("🚀 Starting Telegram Audio Bot...")
             
@@ -512,14 +672,12 @@ class TelegramAudioBot:
             )
             
             self.is_running = True
+            self._eviction_task = asyncio.create_task(self._evict_idle_sessions())
             logger.info("✅ Bot is running and ready to process audio messages!")
             
             # Keep the bot running until stopped
             # Wait indefinitely - the polling will handle messages
             # The application will run until stopped by signal or error
-            global stop_event
-            stop_event = asyncio.Event()
-            
             try:
                 # Wait for stop signal
                 await stop_event.wait()
@@ -529,12 +687,32 @@ class TelegramAudioBot:
             except KeyboardInterrupt:
                 logger.info("📶 Received interrupt signal")
             finally:
+                # Restore default signal handling so a second Ctrl+C can
+                # interrupt a shutdown that hangs
+                self._set_stop_signal_handlers(loop, install=False)
+                
                 # Clean shutdown
                 await self.stop_bot()
             
         except Exception as e:
-            logger.error(f"❌ Failed to start bot: {e}")
+            logger.error("❌ Failed to start bot: %s", e)
             raise
+        finally:
+            # No-op after a normal shutdown; covers a failed startup
+            self._set_stop_signal_handlers(loop, install=False)
+    
+    @staticmethod
+    def _set_stop_signal_handlers(loop: asyncio.AbstractEventLoop, install: bool):
+        """Install (or remove) the loop's SIGINT/SIGTERM handlers that set stop_event"""
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                if install:
+                    loop.add_signal_handler(sig, stop_event.set)
+                else:
+                    loop.remove_signal_handler(sig)
+            except NotImplementedError:
+                # Not supported on Windows; KeyboardInterrupt still applies
+                pass
     
     async def stop_bot(self):
         """Stop the Telegram bot gracefully"""
@@ -542,6 +720,11 @@ class TelegramAudioBot:
             logger.info("🛑 Stopping Telegram Audio Bot...")
             
             try:
+                # Stop the idle-session sweeper
+                if self._eviction_task:
+                    self._eviction_task.cancel()
+                    await asyncio.gather(self._eviction_task, return_exceptions=True)
+                
                 # Sync whitelist config from Docker volume before shutdown
                 await self._sync_whitelist_config()
                 
@@ -549,21 +732,41 @@ class TelegramAudioBot:
                 await self.application.stop()
                 await self.application.shutdown()
                 
+                # Close the shared HTTP connection pool
+                if self._http:
+                    await self._http.aclose()
+                
                 self.is_running = False
                 logger.info("✅ Bot stopped successfully")
                 
             except Exception as e:
-                logger.error(f"❌ Error stopping bot: {e}")
+                logger.error("❌ Error stopping bot: %s", e)
+    
+    async def _evict_idle_sessions(self):
+        """Periodically drop sessions idle for longer than settings.session_ttl"""
+        # At least 1s, so SESSION_TTL=0 can't turn this into a busy loop
+        interval = max(1, min(settings.session_ttl, 300))
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - settings.session_ttl
+            idle = [
+                user_id for user_id, session in self.user_sessions.items()
+                if session.last_activity < cutoff
+            ]
+            for user_id in idle:
+                self.user_sessions.pop(user_id, None)
+            if idle:
+                logger.info("🧹 Evicted %d idle user sessions", len(idle))
     
     async def _sync_whitelist_config(self):
         """Sync whitelist_config.py from Docker volume to project directory"""
         try:
-            import os
-            from pathlib import Path
+            # Filesystem calls run in a worker thread so the event loop keeps
+            # serving in-flight requests during shutdown
             
             # Only sync if running in Docker
             docker_config = Path("/app/config/whitelist_config.py")
-            if not docker_config.exists():
+            if not await asyncio.to_thread(docker_config.exists):
                 logger.info("Not running in Docker, skipping config sync")
                 return
             
@@ -573,20 +776,17 @@ class TelegramAudioBot:
             target_config = Path(project_root) / "whitelist_config.py"
             
             # If we can't write to project root, try to copy to a known location
-            if not os.access(Path(project_root), os.W_OK):
+            if not await asyncio.to_thread(os.access, project_root, os.W_OK):
                 logger.warning("Cannot write to project root, config sync skipped")
                 return
             
-            # Copy from Docker volume to project directory
-            import shutil
-            if docker_config.exists():
-                shutil.copy2(docker_config, target_config)
-                logger.info(f"✅ Synced whitelist_config.py to {target_config}")
-            else:
-                logger.info("No config file in Docker volume to sync")
-                
+            # Copy from Docker volume to project directory (existence was
+            # checked above; a vanished file is reported by the except below)
+            await asyncio.to_thread(shutil.copy2, docker_config, target_config)
+            logger.info("✅ Synced whitelist_config.py to %s", target_config)
+            
         except Exception as e:
-            logger.warning(f"Could not sync whitelist config: {e}")
+            logger.warning("Could not sync whitelist config: %s", e)
             # Don't fail shutdown if sync fails
 
 # ===========================================
@@ -597,26 +797,11 @@ class TelegramAudioBot:
 bot_instance: Optional[TelegramAudioBot] = None
 stop_event: Optional[asyncio.Event] = None
 
-def signal_handler(signum, frame):
-    """Handle shutdown signals gracefully"""
-    logger.info(f"📶 Received signal {signum}, initiating graceful shutdown...")
-    
-    # Set the stop event to break the main loop
-    if stop_event and not stop_event.is_set():
-        stop_event.set()
-    
-    logger.info("👋 Shutdown signal sent")
-    # Don't call sys.exit here - let the main loop handle cleanup
-
 async def main():
     """Main application entry point"""
     global bot_instance
     
     try:
-        # Setup signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
-        
         # Create and start the bot
         bot_instance = TelegramAudioBot()
         await bot_instance.start_bot()
@@ -626,7 +811,7 @@ async def main():
         if bot_instance:
             await bot_instance.stop_bot()
     except Exception as e:
-        logger.error(f"❌ Fatal error: {e}", exc_info=True)
+        logger.error("❌ Fatal error: %s", e, exc_info=True)
         if bot_instance:
             await bot_instance.stop_bot()
         sys.exit(1)
@@ -637,22 +822,32 @@ if __name__ == "__main__":
     
     # Validate configuration before starting
     try:
-        logger.info(f"📋 Configuration validation:")
-        logger.info(f"  • Bot Token: {'✅ Set' if settings.telegram_bot_token else '❌ Missing'}")
-        logger.info(f"  • ElevenLabs API: {'✅ Set' if settings.elevenlabs_api_key else '❌ Missing'}")
-        logger.info(f"  • OpenAI API: {'✅ Set' if settings.openai_api_key else '❌ Missing'}")
-        logger.info(f"  • OpenAI Model: {settings.openai_model}")
-        logger.info(f"  • Upload Dir: {settings.upload_dir}")
-        logger.info(f"  • Log Level: {settings.log_level}")
+        logger.info("📋 Configuration validation:")
+        logger.info("  • Bot Token: %s", '✅ Set' if settings.telegram_bot_token else '❌ Missing')
+        logger.info("  • ElevenLabs API: %s", '✅ Set' if settings.elevenlabs_api_key else '❌ Missing')
+        logger.info("  • OpenAI API: %s", '✅ Set' if settings.openai_api_key else '❌ Missing')
+        logger.info("  • OpenAI Model: %s", settings.openai_model)
+        logger.info("  • Upload Dir: %s", settings.upload_dir)
+        logger.info("  • Log Level: %s", settings.log_level)
         
         # Check for missing critical configuration
         if not all([settings.telegram_bot_token, settings.elevenlabs_api_key, settings.openai_api_key]):
             logger.error("❌ Missing required API keys! Check your .env file.")
             sys.exit(1)
         
+        # Use uvloop's libuv-based event loop when it is installed
+        # (uvloop does not support Windows)
+        if sys.platform != "win32":
+            try:
+                import uvloop
+                uvloop.install()
+                logger.info("⚡ Using uvloop event loop")
+            except ImportError:
+                logger.info("uvloop not installed, using the default asyncio event loop")
+        
         # Start the event loop
         asyncio.run(main())
         
     except Exception as e:
-        logger.error(f"❌ Application startup failed: {e}", exc_info=True)
+        logger.error("❌ Application startup failed: %s", e, exc_info=True)
         sys.exit(1)
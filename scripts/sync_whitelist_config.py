@@ -2,56 +2,102 @@
 """
 Sync whitelist_config.py from Docker volume to project directory
 This script can be run manually or as a shutdown hook
+
+Uses the Docker SDK (pip install docker) when available, which talks to the
+daemon over one persistent connection; falls back to the docker CLI otherwise.
 """
+import io
 import os
 import sys
 import subprocess
+import tarfile
 from pathlib import Path
 
-def find_container():
-    """Find the Docker container name"""
+try:
+    import docker
+except ImportError:
+    docker = None
+
+def get_docker_client():
+    """Return a Docker SDK client, or None to use the docker CLI"""
+    if docker is None:
+        return None
     try:
-        # Try docker-compose naming
-        result = subprocess.run(
-            ["docker", "ps", "-a", "--format", "{{.Names}}"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        containers = result.stdout.strip().split('\n')
+        return docker.from_env()
+    except Exception as e:
+        print(f"⚠️  Docker SDK unavailable ({e}), using docker CLI")
+        return None
+
+# Substrings that identify the bot container by name
+CONTAINER_KEYWORDS = ('telegram', 'bot', 'adick')
+
+def find_container(client=None):
+    """Find the name of the running bot container"""
+    try:
+        # Only running containers: the config is read with docker exec
+        if client is not None:
+            names = [container.name for container in client.containers.list()]
+        else:
+            # Try docker-compose naming
+            result = subprocess.run(
+                ["docker", "ps", "--filter", "status=running", "--format", "{{.Names}}"],
+                capture_output=True,
+                text=True,
+                timeout=5
+            )
+            names = result.stdout.split()
         
         # Look for bot container
-        for container in containers:
-            if 'telegram' in container.lower() or 'bot' in container.lower() or 'adick' in container.lower():
-                return container
-        
-        return None
+        return next(
+            (name for name in names if any(k in name.lower() for k in CONTAINER_KEYWORDS)),
+            None
+        )
     except Exception as e:
         print(f"Error finding container: {e}")
         return None
 
-def sync_config_from_container(container_name, source_path, dest_path):
+def sync_config_from_container(container_name, source_path, dest_path, client=None):
     """Copy config file from Docker container to project directory"""
     try:
-        # Check if source exists in container
-        check_cmd = ["docker", "exec", container_name, "test", "-f", source_path]
-        result = subprocess.run(check_cmd, capture_output=True, timeout=5)
+        if client is not None:
+            # get_archive returns the file as a tar stream, no extra process
+            try:
+                stream, _ = client.containers.get(container_name).get_archive(source_path)
+            except docker.errors.NotFound:
+                print(f"⚠️  Config file not found in container: {source_path}")
+                return False
+            
+            with tarfile.open(fileobj=io.BytesIO(b"".join(stream))) as tar:
+                member = tar.next()
+                data = tar.extractfile(member).read() if member and member.isfile() else None
+            
+            if data is None:
+                print(f"⚠️  Config file not found in container: {source_path}")
+                return False
+            
+            with open(dest_path, 'wb') as f:
+                f.write(data)
+            
+            print(f"✅ Successfully synced whitelist_config.py")
+            print(f"📝 Destination: {Path(dest_path).absolute()}")
+            return True
+        
+        # Read the file in a single docker exec (cat fails if it is missing)
+        # instead of a separate existence check followed by docker cp
+        read_cmd = ["docker", "exec", container_name, "cat", source_path]
+        result = subprocess.run(read_cmd, capture_output=True, timeout=10)
         
         if result.returncode != 0:
-            print(f"⚠️  Config file not found in container: {source_path}")
+            error = result.stderr.decode(errors="replace").strip()
+            print(f"⚠️  Could not read config file in container: {source_path} ({error})")
             return False
         
-        # Copy file from container
-        copy_cmd = ["docker", "cp", f"{container_name}:{source_path}", dest_path]
-        result = subprocess.run(copy_cmd, capture_output=True, text=True, timeout=10)
+        with open(dest_path, 'wb') as f:
+            f.write(result.stdout)
         
-        if result.returncode == 0:
-            print(f"✅ Successfully synced whitelist_config.py")
-            print(f"📝 Destination: {Path(dest_path).absolute()}")
-            return True
-        else:
-            print(f"❌ Failed to copy: {result.stderr}")
-            return False
+        print(f"✅ Successfully synced whitelist_config.py")
+        print(f"📝 Destination: {Path(dest_path).absolute()}")
+        return True
             
     except subprocess.TimeoutExpired:
         print("❌ Operation timed out")
@@ -62,6 +108,7 @@ def sync_config_from_container(container_name, source_path, dest_path):
 
 def sync_from_volume(volume_name, dest_path):
     """Try to extract config from Docker volume"""
+    tmp_path = None
     try:
         # Create temporary container to access volume
         temp_container = f"temp_sync_{os.getpid()}"
@@ -75,20 +122,37 @@ def sync_from_volume(volume_name, dest_path):
             "cat", "/data/whitelist_config.py"
         ]
         
-        result = subprocess.run(run_cmd, capture_output=True, text=True, timeout=10)
+        # Stream stdout straight into a temporary sibling file and only replace
+        # the destination once the read succeeded. The deadline still applies:
+        # a stuck daemon or a slow image pull must not hang the shutdown sync.
+        tmp_path = f"{dest_path}.tmp"
+        with open(tmp_path, 'wb') as out:
+            proc = subprocess.Popen(run_cmd, stdout=out, stderr=subprocess.DEVNULL)
+            try:
+                returncode = proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+                proc.wait()
+                returncode = None
         
-        if result.returncode == 0 and result.stdout:
-            # Write to destination
-            with open(dest_path, 'w', encoding='utf-8') as f:
-                f.write(result.stdout)
+        if returncode is None:
+            os.unlink(tmp_path)
+            print(f"⚠️  Timed out reading from volume: {volume_name}")
+            return False
+        
+        if returncode == 0 and os.path.getsize(tmp_path) > 0:
+            os.replace(tmp_path, dest_path)
             print(f"✅ Successfully synced from volume: {volume_name}")
             return True
         else:
+            os.unlink(tmp_path)
             print(f"⚠️  Could not read from volume")
             return False
             
     except Exception as e:
         print(f"❌ Error accessing volume: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
         return False
 
 def main():
@@ -99,12 +163,15 @@ def main():
     source_path = "/app/config/whitelist_config.py"
     dest_path = Path(__file__).parent.parent / "whitelist_config.py"
     
+    # One SDK client (or None for the CLI) shared by all Docker calls
+    client = get_docker_client()
+    
     # Try to find container
-    container = find_container()
+    container = find_container(client)
     
     if container:
         print(f"📦 Found container: {container}")
-        if sync_config_from_container(container, source_path, str(dest_path)):
+        if sync_config_from_container(container, source_path, str(dest_path), client):
             return 0
     
     # Try volume approach
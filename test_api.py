@@ -105,15 +105,22 @@ async def main():
     print("🚀 Telegram Audio Bot - API Health Check")
     print("=" * 50)
     
-    # Track test results
-    results = []
+    # Test configuration first; without valid settings the API probes can
+    # only fail, so skip them instead of waiting on network errors
+    results = [await test_configuration()]
     
-    # Test configuration
-    results.append(await test_configuration())
-    
-    # Test external APIs
-    results.append(await test_elevenlabs_api())
-    results.append(await test_gemini_api())
+    if results[0]:
+        # Run the API tests concurrently so the network probes overlap
+        api_results = await asyncio.gather(
+            test_elevenlabs_api(),
+            test_gemini_api(),
+            return_exceptions=True
+        )
+        
+        # A test that raised counts as failed
+        results += [result is True for result in api_results]
+    else:
+        print("\n⏭️  Skipping API tests until the configuration is fixed")
     
     # Summary
     print("\n" + "=" * 50)
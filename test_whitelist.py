@@ -0,0 +1,85 @@
+"""
+Tests for permanent whitelist edits in app/whitelist.py
+
+Usage:
+    python -m pytest test_whitelist.py
+"""
+
+import ast
+import types
+
+import pytest
+
+from app import whitelist
+
+
+COMMENTED_CONFIG = '''\
+# Whitelist Configuration
+AUTHORIZED_USER_IDS = [
+    # Team
+    546321644,  # alice
+    111111111,  # bob
+    222222222,  # carol 🎧
+]
+
+AUTHORIZED_USERNAMES = ["alice", "bob"]  # short list
+
+ADMIN_USER_IDS = [
+    546321644,  # alice
+]
+'''
+
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    """Point the whitelist module at a scratch config file and runtime state"""
+    path = tmp_path / "whitelist_config.py"
+    path.write_text(COMMENTED_CONFIG, encoding='utf-8')
+
+    monkeypatch.setattr(whitelist, "_get_config_file_path", lambda: path)
+    monkeypatch.setattr(whitelist, "_sync_to_project_directory", lambda source_file: None)
+    monkeypatch.setattr(whitelist, "config", types.SimpleNamespace())
+    monkeypatch.setattr(whitelist, "_AUTH_IDS_SET", set())
+    monkeypatch.setattr(whitelist, "_AUTH_USERNAMES_SET", set())
+    monkeypatch.setattr(whitelist, "_ADMIN_IDS_SET", set())
+    return path
+
+
+def _lists(source):
+    return {name: ast.literal_eval(node.value)
+            for name, node in whitelist._find_config_lists(source, "<test>").items()}
+
+
+def test_edit_keeps_comments_of_untouched_entries(config_file):
+    assert whitelist.apply_whitelist_changes(
+        add_ids=[333333333],
+        remove_ids=[111111111],
+        add_usernames=["dave"],
+        remove_usernames=["bob"],
+        add_admin_ids=[111111111],
+    )
+
+    source = config_file.read_text(encoding='utf-8')
+    assert "    # Team\n    546321644,  # alice\n    222222222,  # carol 🎧\n    333333333,\n]" in source
+    assert "# bob" not in source
+    assert 'AUTHORIZED_USERNAMES = ["alice", "dave"]  # short list\n' in source
+    assert "ADMIN_USER_IDS = [\n    546321644,  # alice\n    111111111,\n]" in source
+    assert _lists(source) == {
+        'AUTHORIZED_USER_IDS': [546321644, 222222222, 333333333],
+        'AUTHORIZED_USERNAMES': ["alice", "dave"],
+        'ADMIN_USER_IDS': [546321644, 111111111],
+    }
+
+
+def test_remove_last_entry_without_trailing_comma(config_file):
+    config_file.write_text("AUTHORIZED_USER_IDS = [1, 2]\nAUTHORIZED_USERNAMES = []\nADMIN_USER_IDS = [\n    1  # root\n]\n",
+                           encoding='utf-8')
+
+    assert whitelist.apply_whitelist_changes(remove_ids=[2], add_usernames=["eve"], add_admin_ids=[5])
+
+    source = config_file.read_text(encoding='utf-8')
+    assert source == (
+        'AUTHORIZED_USER_IDS = [1]\n'
+        'AUTHORIZED_USERNAMES = ["eve"]\n'
+        'ADMIN_USER_IDS = [\n    1,  # root\n    5,\n]\n'
+    )
@@ -2,15 +2,24 @@ import os
 import logging
 import tempfile
 import shutil
+import stat
 import time
 import hashlib
 from pathlib import Path
 from typing import Dict, List, Optional, Union
 from app.config import settings
 
+try:
+    from blake3 import blake3
+except ImportError:  # Optional (pip install blake3); fall back to hashlib SHA-256
+    blake3 = None
+
 # Get logger for this module
 logger = logging.getLogger(__name__)
 
+# Audio file extensions accepted by validate_audio_file
+_VALID_AUDIO_EXTS = frozenset({".mp3", ".wav", ".ogg", ".m4a", ".flac", ".aac"})
+
 class FileHandler:
     def __init__(self):
         self.upload_dir = Path(settings.upload_dir)
@@ -19,20 +28,23 @@ class FileHandler:
 
         logger.info(f"File directory initialized in directory {self.upload_dir.absolute()}")
 
-        self._created_files_ = list()
+        # Temp files created by this handler, mapped to their creation time
+        self._created_files: Dict[str, float] = {}
 
     def create_temp_file(self, suffix: str = ".tmp", prefix:str = "audio_") -> str:
         try:
-            temp_file = tempfile.NamedTemporaryFile(
+            # Close the handle right away; callers only need the path
+            with tempfile.NamedTemporaryFile(
                 delete=False,
                 suffix=suffix,
                 prefix=prefix,
                 dir=self.upload_dir
-            )
+            ) as temp_file:
+                temp_file_path = temp_file.name
 
-            temp_file_path = temp_file.name
+            self._created_files[temp_file_path] = time.time()
 
-            logger.debug("Created temporary file {temp_File_path}")
+            logger.debug(f"Created temporary file {temp_file_path}")
 
             return temp_file_path
         except Exception as e:
@@ -46,8 +58,7 @@ class FileHandler:
             if path.exists() and path.is_file():
                 path.unlink()
 
-                if str(file_path) in self._created_files_:
-                    self._created_files_.remove(str(file_path))
+                self._created_files.pop(str(file_path), None)
 
                 logger.debug("File succesfully deleted {file_path}")
                 return True
@@ -61,31 +72,36 @@ class FileHandler:
             logger.error("Error occured while fle deletion {e}")    
             return False
         
-    def get_file_info(self, file_path: Union[str, Path]) -> Dict[str, Union[int, float, str]]:
+    def get_file_info(
+        self,
+        file_path: Union[str, Path],
+        compute_hash: bool = False
+    ) -> Dict[str, Union[int, float, str]]:
         """
         Get comprehensive information about a file
         
         Args:
             file_path: Path to the file
+            compute_hash: Also hash the file contents (reads the whole file)
             
         Returns:
             dict: File information including size, timestamps, extension, etc.
+                  content_hash is only included when compute_hash is True
             
         Example:
-            info = handler.get_file_info("audio.wav")
-            print(f"File size: {info['size']} bytes")
+            info = handler.get_file_info("audio.wav", compute_hash=True)
+            print(f"File size: {info['size']} bytes, hash: {info['content_hash']}")
         """
         try:
             path = Path(file_path)
             
-            if not path.exists():
+            # A single stat() both checks existence and gives all metadata
+            try:
+                stat_info = path.stat()
+            except FileNotFoundError:
                 logger.warning(f"File does not exist: {file_path}")
                 return {}
             
-            stat_info = path.stat()
-            
-            file_hash = self._calculate_file_hash(path)
-            
             file_info = {
                 "path": str(path.absolute()),
                 "name": path.name,
@@ -95,11 +111,16 @@ class FileHandler:
                 "created": stat_info.st_ctime,
                 "modified": stat_info.st_mtime,
                 "accessed": stat_info.st_atime,
-                "is_readable": os.access(path, os.R_OK),
-                "is_writable": os.access(path, os.W_OK),
-                "md5_hash": file_hash,
+                # Owner permission bits from the stat result; files here are
+                # created by this process, and it saves two access() syscalls
+                "is_readable": bool(stat_info.st_mode & stat.S_IRUSR),
+                "is_writable": bool(stat_info.st_mode & stat.S_IWUSR),
             }
             
+            if compute_hash:
+                # BLAKE3 or SHA-256, never MD5, so there is no md5_hash key
+                file_info["content_hash"] = self._calculate_file_hash(path)
+            
             logger.debug(f"Retrieved file info for: {file_path}")
             return file_info
             
@@ -125,41 +146,41 @@ class FileHandler:
         try:
             path = Path(file_path)
             
-            # Check if file exists
-            if not path.exists():
-                return {"valid": False, "error": "File does not exist"}
-            
-            # Get file info
-            file_info = self.get_file_info(path)
+            # Check file extension first; it needs no filesystem access
+            extension = path.suffix.lower()
+            if extension not in _VALID_AUDIO_EXTS:
+                return {
+                    "valid": False, 
+                    "error": f"Unsupported file type: {extension}"
+                }
             
-            if not file_info or "error" in file_info:
+            # A single stat() gives existence and size
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return {"valid": False, "error": "File does not exist"}
+            except OSError:
                 return {"valid": False, "error": "Could not read file information"}
             
+            size_mb = round(size / (1024 * 1024), 2)
+            
             # Check file size
-            if file_info["size"] > settings.max_file_size:
+            if size > settings.max_file_size:
                 max_mb = settings.max_file_size / (1024 * 1024)
                 return {
                     "valid": False, 
-                    "error": f"File too large: {file_info['size_mb']}MB > {max_mb}MB"
+                    "error": f"File too large: {size_mb}MB > {max_mb}MB"
                 }
             
             # Check if file is empty
-            if file_info["size"] == 0:
+            if size == 0:
                 return {"valid": False, "error": "File is empty"}
             
-            # Check file extension
-            valid_extensions = {".mp3", ".wav", ".ogg", ".m4a", ".flac", ".aac"}
-            if file_info["extension"] not in valid_extensions:
-                return {
-                    "valid": False, 
-                    "error": f"Unsupported file type: {file_info['extension']}"
-                }
-            
             # All checks passed
             return {
                 "valid": True, 
-                "size_mb": file_info["size_mb"],
-                "extension": file_info["extension"]
+                "size_mb": size_mb,
+                "extension": extension
             }
             
         except Exception as e:
@@ -168,7 +189,11 @@ class FileHandler:
     
     def cleanup_old_files(self, max_age_hours: int = 24) -> int:
         """
-        Clean up old temporary files from the upload directory
+        Clean up old temporary files created by this handler
+        
+        Only the tracked files are checked, so the cost depends on how many
+        files were created rather than on the size of the upload directory.
+        Files left over from earlier runs are only removed by deep_cleanup().
         
         Args:
             max_age_hours: Maximum age of files to keep (in hours)
@@ -178,31 +203,70 @@ class FileHandler:
             
         This method should be called periodically to prevent disk space issues.
         """
+        cutoff = time.time() - max_age_hours * 3600
+        cleaned_count = 0
+        
+        expired = [path for path, created in self._created_files.items() if created < cutoff]
+        for file_path in expired:
+            try:
+                os.unlink(file_path)
+                cleaned_count += 1
+            except FileNotFoundError:
+                pass  # Already gone; just stop tracking it
+            except OSError as e:
+                logger.warning(f"Could not clean up file {file_path}: {e}")
+                continue
+            del self._created_files[file_path]
+        
+        if cleaned_count > 0:
+            logger.info(f"Cleaned up {cleaned_count} old tracked files")
+        
+        return cleaned_count
+    
+    def deep_cleanup(self, max_age_hours: int = 24) -> int:
+        """
+        Clean up old files anywhere in the upload directory
+        
+        Scans the whole directory, including files this handler did not create
+        (e.g. left over from a previous run). Intended for an occasional
+        periodic sweep; use cleanup_old_files() for routine cleanup.
+        
+        Args:
+            max_age_hours: Maximum age of files to keep (in hours)
+            
+        Returns:
+            int: Number of files cleaned up
+        """
         try:
-            current_time = time.time()
-            max_age_seconds = max_age_hours * 3600
+            # Anything last modified before the cutoff is too old
+            cutoff = time.time() - max_age_hours * 3600
             cleaned_count = 0
+            cleaned_names = [] if logger.isEnabledFor(logging.DEBUG) else None
             
             logger.info(f"Starting cleanup of files older than {max_age_hours} hours")
             
-            # Iterate through all files in upload directory
-            for file_path in self.upload_dir.iterdir():
-                if file_path.is_file():
+            # Iterate through all files in upload directory; scandir entries
+            # carry the file type and cache stat(), saving syscalls per file
+            with os.scandir(self.upload_dir) as entries:
+                for entry in entries:
                     try:
-                        # Calculate file age
-                        file_age = current_time - file_path.stat().st_mtime
-                        
-                        if file_age > max_age_seconds:
+                        if not entry.is_file(follow_symlinks=False):
+                            continue
+                        if entry.stat(follow_symlinks=False).st_mtime < cutoff:
                             # File is too old, delete it
-                            file_path.unlink()
+                            os.unlink(entry.path)
+                            self._created_files.pop(entry.path, None)
                             cleaned_count += 1
-                            logger.debug(f"Cleaned up old file: {file_path.name}")
+                            if cleaned_names is not None:
+                                cleaned_names.append(entry.name)
                             
-                    except Exception as e:
-                        logger.warning(f"Could not clean up file {file_path}: {e}")
+                    except OSError as e:
+                        logger.warning(f"Could not clean up file {entry.path}: {e}")
             
             if cleaned_count > 0:
                 logger.info(f"Cleaned up {cleaned_count} old files")
+                if cleaned_names is not None:
+                    logger.debug(f"Cleaned up old files: {', '.join(cleaned_names)}")
             else:
                 logger.debug("No old files found to clean up")
             
@@ -225,24 +289,27 @@ class FileHandler:
             oldest_file = None
             newest_file = None
             
-            for file_path in self.upload_dir.iterdir():
-                if file_path.is_file():
+            with os.scandir(self.upload_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
                     file_count += 1
-                    file_size = file_path.stat().st_size
-                    total_size += file_size
+                    stat_info = entry.stat(follow_symlinks=False)
+                    total_size += stat_info.st_size
                     
-                    file_mtime = file_path.stat().st_mtime
+                    file_mtime = stat_info.st_mtime
                     if oldest_file is None or file_mtime < oldest_file:
                         oldest_file = file_mtime
                     if newest_file is None or file_mtime > newest_file:
                         newest_file = file_mtime
             
+            now = time.time()
             return {
                 "file_count": file_count,
                 "total_size_bytes": total_size,
                 "total_size_mb": round(total_size / (1024 * 1024), 2),
-                "oldest_file_age_hours": (time.time() - oldest_file) / 3600 if oldest_file else 0,
-                "newest_file_age_hours": (time.time() - newest_file) / 3600 if newest_file else 0,
+                "oldest_file_age_hours": (now - oldest_file) / 3600 if oldest_file else 0,
+                "newest_file_age_hours": (now - newest_file) / 3600 if newest_file else 0,
                 "directory_path": str(self.upload_dir.absolute())
             }
             
@@ -250,26 +317,29 @@ class FileHandler:
             logger.error(f"Error getting directory stats: {e}")
             return {"error": str(e)}
     
-    def _calculate_file_hash(self, file_path: Path, chunk_size: int = 8192) -> str:
+    def _calculate_file_hash(self, file_path: Path) -> str:
         """
-        Calculate MD5 hash of a file for integrity checking
+        Calculate a content hash of a file for integrity checking
+        
+        Uses BLAKE3 (SIMD, multithreaded, memory-mapped) when the blake3
+        package is installed, otherwise SHA-256 via hashlib.file_digest.
         
         Args:
             file_path: Path to the file
-            chunk_size: Size of chunks to read at a time
             
         Returns:
-            str: MD5 hash of the file
+            str: Hex digest of the file contents
         """
         try:
-            hash_md5 = hashlib.md5()
+            if blake3 is not None:
+                return blake3(max_threads=blake3.AUTO).update_mmap(str(file_path)).hexdigest()
             
+            # Integrity check only: usedforsecurity=False keeps this working
+            # on FIPS-restricted OpenSSL builds
             with open(file_path, "rb") as f:
-                # Read file in chunks to handle large files efficiently
-                for chunk in iter(lambda: f.read(chunk_size), b""):
-                    hash_md5.update(chunk)
-            
-            return hash_md5.hexdigest()
+                return hashlib.file_digest(
+                    f, lambda: hashlib.new("sha256", usedforsecurity=False)
+                ).hexdigest()
             
         except Exception as e:
             logger.warning(f"Could not calculate hash for {file_path}: {e}")
@@ -280,5 +350,5 @@ class FileHandler:
         Cleanup any remaining temporary files when the object is destroyed
         """
         if hasattr(self, '_created_files'):
-            for file_path in self._created_files.copy():
+            for file_path in list(self._created_files):
                 self.cleanup_file(file_path)
\ No newline at end of file